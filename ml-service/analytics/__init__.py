@@ -3,12 +3,20 @@ from .generate_reports import generate_event_analytics_report
 from .chart_generator import (
     generate_booking_trends_chart,
     generate_revenue_chart,
-    generate_user_engagement_chart
+    generate_user_engagement_chart,
+    render_booking_trends_chart,
+    render_revenue_chart,
+    render_user_engagement_chart,
+    generate_all
 )
 
 __all__ = [
     'generate_event_analytics_report',
     'generate_booking_trends_chart',
     'generate_revenue_chart',
-    'generate_user_engagement_chart'
+    'generate_user_engagement_chart',
+    'render_booking_trends_chart',
+    'render_revenue_chart',
+    'render_user_engagement_chart',
+    'generate_all'
 ]
\ No newline at end of file
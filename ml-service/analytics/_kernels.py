@@ -0,0 +1,74 @@
+"""
+Numeric kernels for the report generator
+Fuses the per-column summary reductions into a single pass over the data
+"""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # Compiled lazily: columns arrive both writable (pandas) and read-only
+    # (polars/Arrow), which are distinct numba types.
+    # No fastmath: the NaN checks below must not be optimized away
+    @njit(cache=True)
+    def _summary_kernel(revenue, attendees, rating, rating_bins):
+        sums = np.zeros(3)
+        counts = np.zeros(3, np.int64)
+        hist = np.zeros(rating_bins.shape[0] - 1, np.int64)
+        n = max(revenue.shape[0], attendees.shape[0], rating.shape[0])
+        for i in range(n):
+            if i < revenue.shape[0] and not np.isnan(revenue[i]):
+                sums[0] += revenue[i]
+                counts[0] += 1
+            if i < attendees.shape[0] and not np.isnan(attendees[i]):
+                sums[1] += attendees[i]
+                counts[1] += 1
+            if i < rating.shape[0] and not np.isnan(rating[i]):
+                r = rating[i]
+                sums[2] += r
+                counts[2] += 1
+                # Bins are [a, b) except the last, as in np.histogram
+                b = 0
+                while b < hist.shape[0] - 1 and r >= rating_bins[b + 1]:
+                    b += 1
+                hist[b] += 1
+        return sums, counts, hist
+
+def _as_float_array(values) -> np.ndarray:
+    if values is None:
+        return np.empty(0)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def summary_reductions(revenue, attendees, rating,
+                       rating_bins: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    NaN-skipping sums and means of revenue, attendees and rating, plus the
+    rating histogram over rating_bins, computed in one pass
+
+    Args:
+        revenue, attendees, rating: Column values, or None when the column is absent
+        rating_bins: Histogram edges for rating
+
+    Returns:
+        (sums, means, rating_hist); sums/means are ordered revenue, attendees,
+        rating, with NaN means for columns that have no values
+    """
+    revenue, attendees, rating = (_as_float_array(v) for v in (revenue, attendees, rating))
+    rating_bins = _as_float_array(rating_bins)
+
+    if NUMBA_AVAILABLE:
+        sums, counts, hist = _summary_kernel(revenue, attendees, rating, rating_bins)
+    else:
+        columns = (revenue, attendees, rating)
+        sums = np.array([np.nansum(col) for col in columns])
+        counts = np.array([np.count_nonzero(~np.isnan(col)) for col in columns])
+        hist = np.histogram(rating, bins=rating_bins)[0]
+
+    means = np.divide(sums, counts, out=np.full(3, np.nan), where=counts > 0)
+    return sums, means, hist
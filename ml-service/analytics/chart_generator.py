@@ -1,135 +1,568 @@
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")  # headless service: never probe for a GUI backend
+import matplotlib.image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
-import pandas as pd
+import asyncio
+import functools
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from datetime import datetime, timedelta
 import io
-import base64
-from typing import Dict, List, Any, Optional
+try:
+    # SIMD (AVX2/AVX-512) base64 encoder; same API as the stdlib module
+    import pybase64 as base64
+except ImportError:
+    import base64
+from typing import Dict, List, Any, Optional, Tuple
 import json
+import logging
+
+try:
+    import numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Row fields each chart reads; checked up front instead of trapping KeyErrors
+BOOKING_FIELDS = frozenset(('date', 'bookings', 'event_type'))
+ENGAGEMENT_FIELDS = frozenset(('date', 'active_users', 'avg_session_duration'))
+
+# Artists below this zorder (grid 0.5, patches 1) are rasterized in SVG output;
+# lines (2) and text keep their vector form
+PATCH_RASTER_ZORDER = 1.5
+
+# Bundled with matplotlib; naming it directly skips findfont's fallback probing
+CHART_FONT = 'DejaVu Sans'
+matplotlib.rcParams['font.family'] = CHART_FONT
+
+# Output formats supported by _render -> data URI MIME type
+IMAGE_MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml'
+}
+
+if NUMBA_AVAILABLE:
+    # Eager signature: compiled (or loaded from cache) at import without running,
+    # so numba's worker threads are not started before any fork
+    @njit('int64[:](float64[::1], float64, float64, intp, intp)', parallel=True, cache=True)
+    def _hist_kernel(x, lo, hi, bins, n_chunks):
+        # One private histogram per chunk so parallel iterations never share a counter
+        n = x.shape[0]
+        step = (n + n_chunks - 1) // n_chunks
+        inv = bins / (hi - lo)
+        partial = np.zeros((n_chunks, bins), np.int64)
+        for c in prange(n_chunks):
+            for i in range(c * step, min(n, (c + 1) * step)):
+                b = int((x[i] - lo) * inv)
+                if b == bins:  # right edge belongs to the last bin, as in np.histogram
+                    b = bins - 1
+                if 0 <= b < bins:
+                    partial[c, b] += 1
+        return partial.sum(axis=0)
+
+def _histogram(values: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Equal-width histogram with np.histogram semantics; jitted when numba is available"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        lo, hi = 0.0, 1.0
+    else:
+        lo, hi = float(values.min()), float(values.max())
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, bins + 1)
+    if NUMBA_AVAILABLE:
+        counts = _hist_kernel(values, lo, hi, bins, numba.get_num_threads())
+    else:
+        counts, _ = np.histogram(values, bins=edges)
+    return counts, edges
+
+def _iso_date(value: Any) -> Any:
+    """Drop a UTC 'Z' suffix so numpy's fixed ISO-8601 parser accepts the string"""
+    if isinstance(value, str) and value.endswith('Z'):
+        return value[:-1]
+    return value
+
+def _parse_dates(values: List[Any]) -> np.ndarray:
+    """datetime64[s] array of chart dates.
+
+    ISO-8601 strings take numpy's fixed parser; anything else (e.g.
+    '15/01/2024') falls back to pandas' flexible parsing, as the DataFrame
+    charts did. Raises ValueError or TypeError when neither can parse a value.
+    """
+    try:
+        return np.array([_iso_date(v) for v in values], dtype='datetime64[s]')
+    except (TypeError, ValueError):
+        import pandas as pd  # only needed for non-ISO dates
+        parsed = pd.DatetimeIndex(pd.to_datetime(values))
+        if parsed.tz is not None:
+            parsed = parsed.tz_convert(None)
+        return parsed.to_numpy().astype('datetime64[s]')
+
+# Initial capacity of the per-thread output buffer; a typical dashboard PNG fits
+OUTPUT_BUFFER_SIZE = 256 * 1024
+_thread_local = threading.local()
+
+def _output_buffer() -> io.BytesIO:
+    """Per-thread output buffer, rewound (not truncated) so its capacity is kept.
+
+    Callers must only read the first buf.tell() bytes after writing.
+    """
+    buf = getattr(_thread_local, 'buf', None)
+    if buf is None:
+        buf = io.BytesIO(bytearray(OUTPUT_BUFFER_SIZE))
+        _thread_local.buf = buf
+    buf.seek(0)
+    return buf
+
+def _blank_png() -> bytes:
+    """1x1 fully transparent PNG"""
+    buf = io.BytesIO()
+    matplotlib.image.imsave(buf, np.zeros((1, 1, 4)), format='png', metadata={'Software': None})
+    return buf.getvalue()
+
+# Placeholder returned for empty inputs, built once so those calls skip Figure setup
+EMPTY_IMAGES = {
+    'png': _blank_png(),
+    'svg': b'<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"/>'
+}
+
+# Default figure.subplot.* params, restored on reused figures before each render
+SUBPLOT_DEFAULTS = {
+    name: matplotlib.rcParams[f'figure.subplot.{name}']
+    for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+}
+
+# Rendered images kept per ChartGenerator instance
+CHART_CACHE_SIZE = 512
+
+def _day_bucketed(value: Any) -> Any:
+    """Copy of a chart payload with 'date' fields truncated to the day"""
+    if isinstance(value, dict):
+        return {k: (str(v)[:10] if k == 'date' else _day_bucketed(v)) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_day_bucketed(v) for v in value]
+    return value
+
+def _cached_chart(method):
+    """Memoize a render_* method on a hash of its (day-bucketed) payload.
+
+    Payloads are lists/dicts and therefore unhashable, so the key is a
+    blake2b digest of their canonical JSON form.
+    """
+    @functools.wraps(method)
+    def wrapper(self, payload):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{method.__name__}:{self.image_format}:{self.dpi}:".encode())
+        digest.update(json.dumps(_day_bucketed(payload), sort_keys=True, default=str).encode())
+        key = digest.digest()
+        
+        with self._cache_lock:
+            cached = self._chart_cache.get(key)
+            if cached is not None:
+                self._chart_cache.move_to_end(key)
+                return cached
+        
+        result = method(self, payload)
+        if result:
+            with self._cache_lock:
+                self._chart_cache[key] = result
+                if len(self._chart_cache) > CHART_CACHE_SIZE:
+                    self._chart_cache.popitem(last=False)
+        return result
+    return wrapper
 
 class ChartGenerator:
-    def __init__(self):
-        plt.style.use('seaborn-v0_8-darkgrid')
+    def __init__(self, image_format: str = 'png', dpi: int = 72, png_compress_level: int = 1):
+        """
+        Args:
+            image_format: 'png' (default) or 'svg'
+            dpi: Output resolution; 72 suits dashboard thumbnails, raise for print
+            png_compress_level: zlib level 0-9 for PNG output. Low levels are much
+                cheaper to encode; responses are usually gzipped again upstream.
+        """
+        if image_format not in IMAGE_MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        self.image_format = image_format
+        self.dpi = dpi
+        self.png_compress_level = png_compress_level
+        # Constructor arguments, so pool workers can build an identical generator
+        self._options = {
+            'image_format': image_format,
+            'dpi': dpi,
+            'png_compress_level': png_compress_level
+        }
+        matplotlib.style.use('seaborn-v0_8-darkgrid')
         sns.set_palette("husl")
+        # The seaborn style lists Arial first; pin the font again so lookups stay cached
+        matplotlib.rcParams['font.family'] = CHART_FONT
+        # Per thread: (nrows, ncols, figsize) -> (fig, canvas, axes), reused across
+        # that thread's renders, so concurrent renders never share a figure
+        self._figures = threading.local()
+        # payload digest -> rendered image bytes, LRU ordered
+        self._chart_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def _get_fig(self, nrows: int, ncols: int, figsize: tuple):
+        """Return the calling thread's cached figure/canvas/axes triple for this
+        layout, cleared for reuse.
+
+        Figures are built directly on an Agg canvas so nothing is registered
+        with the pyplot figure manager.
+        """
+        fig_cache = getattr(self._figures, 'cache', None)
+        if fig_cache is None:
+            fig_cache = self._figures.cache = {}
         
-    def generate_booking_trends_chart(self, data: List[Dict]) -> str:
-        """Generate booking trends chart for analytics agent"""
+        key = (nrows, ncols, figsize)
+        cached = fig_cache.get(key)
+        if cached is None:
+            fig = Figure(figsize=figsize, dpi=self.dpi)
+            canvas = FigureCanvasAgg(fig)
+            cached = (fig, canvas, fig.subplots(nrows, ncols))
+            fig_cache[key] = cached
+        else:
+            fig = cached[0]
+            for ax in fig.axes:
+                ax.clear()
+            # tight_layout() starts from the current subplot params, so reset
+            # them or margins from the previous render compound
+            fig.subplots_adjust(**SUBPLOT_DEFAULTS)
+        return cached
+    
+    def _render(self, fig: Figure, canvas: FigureCanvasAgg) -> bytes:
+        """Render the figure to image bytes (PNG by default, or SVG for vector consumers).
+
+        Output goes to a reused per-thread buffer and is copied out once
+        through a memoryview.
+        """
+        fig.set_dpi(self.dpi)
+        buf = _output_buffer()
         try:
-            df = pd.DataFrame(data)
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.sort_values('date')
-            
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-            
-            # Line chart for bookings over time
-            ax1.plot(df['date'], df['bookings'], marker='o', linewidth=2)
-            ax1.set_title('Daily Bookings Trend', fontsize=14, fontweight='bold')
-            ax1.set_xlabel('Date')
-            ax1.set_ylabel('Number of Bookings')
-            ax1.grid(True, alpha=0.3)
-            
-            # Bar chart for booking types
-            booking_types = df.groupby('event_type')['bookings'].sum()
-            ax2.bar(booking_types.index, booking_types.values)
-            ax2.set_title('Bookings by Event Type', fontsize=14, fontweight='bold')
-            ax2.set_xlabel('Event Type')
-            ax2.set_ylabel('Total Bookings')
-            ax2.tick_params(axis='x', rotation=45)
-            
-            plt.tight_layout()
-            
-            # Convert to base64
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            buf.seek(0)
-            img_str = base64.b64encode(buf.read()).decode('utf-8')
-            plt.close()
-            
-            return f"data:image/png;base64,{img_str}"
-            
-        except Exception as e:
-            print(f"Chart generation error: {e}")
+            if self.image_format == 'svg':
+                fig.savefig(buf, format='svg')
+            else:
+                canvas.print_png(buf, pil_kwargs={'compress_level': self.png_compress_level})
+            # Release the views before the buffer is written again
+            with buf.getbuffer() as view, view[:buf.tell()] as image:
+                return bytes(image)
+        except Exception:
+            logger.exception("Chart rendering failed")
+            return b""
+    
+    def _data_uri(self, image: bytes) -> str:
+        """Wrap rendered image bytes in a base64 data URI ('' for no image)"""
+        if not image:
             return ""
+        img_str = base64.b64encode(image).decode('ascii')
+        return f"data:{IMAGE_MIME_TYPES[self.image_format]};base64,{img_str}"
+    
+    def generate_booking_trends_chart(self, data: List[Dict]) -> str:
+        """Generate booking trends chart for analytics agent"""
+        return self._data_uri(self.render_booking_trends_chart(data))
     
     def generate_revenue_chart(self, revenue_data: Dict) -> str:
         """Generate revenue breakdown charts"""
-        try:
-            fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-            
-            # Pie chart for revenue sources
-            sources = revenue_data.get('sources', {})
-            labels = list(sources.keys())
-            values = list(sources.values())
-            
-            axes[0].pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
-            axes[0].set_title('Revenue by Source', fontsize=12, fontweight='bold')
-            
-            # Bar chart for monthly revenue
-            monthly = revenue_data.get('monthly', {})
-            months = list(monthly.keys())
-            revenue = list(monthly.values())
-            
-            axes[1].bar(months, revenue, color='skyblue')
-            axes[1].set_title('Monthly Revenue', fontsize=12, fontweight='bold')
-            axes[1].set_xlabel('Month')
-            axes[1].set_ylabel('Revenue ($)')
-            axes[1].tick_params(axis='x', rotation=45)
-            
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=100)
-            buf.seek(0)
-            img_str = base64.b64encode(buf.read()).decode('utf-8')
-            plt.close()
-            
-            return f"data:image/png;base64,{img_str}"
-            
-        except Exception as e:
-            print(f"Revenue chart error: {e}")
-            return ""
+        return self._data_uri(self.render_revenue_chart(revenue_data))
     
     def generate_user_engagement_chart(self, engagement_data: Dict) -> str:
         """Generate user engagement metrics chart"""
+        return self._data_uri(self.render_user_engagement_chart(engagement_data))
+    
+    @_cached_chart
+    def render_booking_trends_chart(self, data: List[Dict]) -> bytes:
+        """Render booking trends chart to raw image bytes"""
+        if not data:
+            return EMPTY_IMAGES[self.image_format]
+        if not all(BOOKING_FIELDS <= row.keys() for row in data):
+            logger.warning("Booking trends chart skipped: rows need %s", sorted(BOOKING_FIELDS))
+            return b""
+        
+        # Rows -> typed columns; no DataFrame for a handful of points.
+        # Missing counts (None) become NaN, as they did in the DataFrame.
+        n = len(data)
         try:
-            df = pd.DataFrame(engagement_data['metrics'])
-            
-            fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-            
-            # User activity over time
-            axes[0, 0].plot(df['date'], df['active_users'], color='green')
-            axes[0, 0].set_title('Active Users')
-            axes[0, 0].grid(True, alpha=0.3)
-            
-            # Session duration
-            axes[0, 1].hist(df['avg_session_duration'], bins=20, color='orange', alpha=0.7)
-            axes[0, 1].set_title('Session Duration Distribution')
-            
-            # Feature usage
-            features = engagement_data.get('feature_usage', {})
-            axes[1, 0].bar(features.keys(), features.values())
-            axes[1, 0].set_title('Feature Usage')
-            axes[1, 0].tick_params(axis='x', rotation=45)
-            
-            # Conversion funnel
-            funnel = engagement_data.get('conversion_funnel', {})
-            stages = list(funnel.keys())
-            conversions = list(funnel.values())
-            axes[1, 1].plot(stages, conversions, marker='s', linewidth=2)
-            axes[1, 1].set_title('Conversion Funnel')
-            axes[1, 1].grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=100)
-            buf.seek(0)
-            img_str = base64.b64encode(buf.read()).decode('utf-8')
-            plt.close()
-            
-            return f"data:image/png;base64,{img_str}"
-            
-        except Exception as e:
-            print(f"Engagement chart error: {e}")
-            return ""
\ No newline at end of file
+            dates = _parse_dates([row['date'] for row in data])
+            bookings = np.fromiter((row['bookings'] for row in data), dtype=np.float64, count=n)
+        except (TypeError, ValueError):
+            logger.warning("Booking trends chart skipped: unparseable dates or non-numeric bookings")
+            return b""
+        event_types = np.empty(n, dtype=object)
+        event_types[:] = [row['event_type'] for row in data]
+        
+        return self.render_booking_trends_chart_soa(dates, bookings, event_types)
+    
+    def generate_booking_trends_chart_soa(self,
+                                          dates: np.ndarray,
+                                          bookings: np.ndarray,
+                                          event_types: np.ndarray) -> str:
+        """Generate booking trends chart from column arrays as a data URI"""
+        return self._data_uri(self.render_booking_trends_chart_soa(dates, bookings, event_types))
+    
+    def render_booking_trends_chart_soa(self,
+                                        dates: np.ndarray,
+                                        bookings: np.ndarray,
+                                        event_types: np.ndarray) -> bytes:
+        """
+        Render booking trends chart from column arrays
+        
+        Args:
+            dates: datetime64 array of booking dates
+            bookings: Numeric array of booking counts (NaN for missing)
+            event_types: Array of event type labels
+        
+        Returns:
+            Chart image bytes in the generator's image format
+        """
+        if len(dates) == 0:
+            return EMPTY_IMAGES[self.image_format]
+        
+        by_date = np.argsort(dates, kind='stable')
+        
+        # Totals per booking type (sort + segmented sum, no GroupBy); missing
+        # counts are skipped, as GroupBy.sum did
+        try:
+            order = np.argsort(event_types, kind='stable')
+        except TypeError:
+            logger.warning("Booking trends chart skipped: event types are not mutually comparable")
+            return b""
+        type_keys, type_starts = np.unique(event_types[order], return_index=True)
+        counts = bookings[order]
+        if counts.dtype.kind == 'f':
+            counts = np.where(np.isnan(counts), 0, counts)
+        type_totals = np.add.reduceat(counts, type_starts)
+        
+        fig, canvas, (ax1, ax2) = self._get_fig(2, 1, (12, 10))
+        
+        # Line chart for bookings over time
+        # Rasterize the (potentially dense) trend line so SVG output stays small
+        ax1.plot(dates[by_date], bookings[by_date], marker='o', linewidth=2,
+                 rasterized=self.image_format == 'svg')
+        ax1.set_title('Daily Bookings Trend', fontsize=14, fontweight='bold')
+        ax1.set_xlabel('Date')
+        ax1.set_ylabel('Number of Bookings')
+        ax1.grid(True, alpha=0.3)
+        
+        # Bar chart for booking types
+        ax2.bar(type_keys, type_totals)
+        ax2.set_title('Bookings by Event Type', fontsize=14, fontweight='bold')
+        ax2.set_xlabel('Event Type')
+        ax2.set_ylabel('Total Bookings')
+        ax2.tick_params(axis='x', rotation=45)
+        
+        fig.tight_layout()
+        
+        return self._render(fig, canvas)
+    
+    @_cached_chart
+    def render_revenue_chart(self, revenue_data: Dict) -> bytes:
+        """Render revenue breakdown charts to raw image bytes"""
+        if not revenue_data or not (revenue_data.get('sources') or revenue_data.get('monthly')):
+            return EMPTY_IMAGES[self.image_format]
+        
+        sources = revenue_data.get('sources', {})
+        monthly = revenue_data.get('monthly', {})
+        try:
+            values = np.fromiter(sources.values(), dtype=np.float64, count=len(sources))
+            revenue = np.fromiter(monthly.values(), dtype=np.float64, count=len(monthly))
+        except (TypeError, ValueError):
+            logger.warning("Revenue chart skipped: source and monthly amounts must be numeric")
+            return b""
+        
+        fig, canvas, axes = self._get_fig(1, 2, (14, 6))
+        
+        # Pie chart for revenue sources; pie() rejects negative, NaN or
+        # all-zero (or no) wedges, so only the title is drawn for those
+        if values.size and (values >= 0).all() and values.sum() > 0:
+            axes[0].pie(values, labels=list(sources.keys()), autopct='%1.1f%%', startangle=90)
+        axes[0].set_title('Revenue by Source', fontsize=12, fontweight='bold')
+        
+        # Bar chart for monthly revenue
+        months = list(monthly.keys())
+        
+        axes[1].bar(months, revenue, color='skyblue')
+        axes[1].set_title('Monthly Revenue', fontsize=12, fontweight='bold')
+        axes[1].set_xlabel('Month')
+        axes[1].set_ylabel('Revenue ($)')
+        axes[1].tick_params(axis='x', rotation=45)
+        
+        fig.tight_layout()
+        
+        return self._render(fig, canvas)
+    
+    @_cached_chart
+    def render_user_engagement_chart(self, engagement_data: Dict) -> bytes:
+        """Render user engagement metrics chart to raw image bytes"""
+        metrics = engagement_data.get('metrics') if engagement_data else None
+        if not metrics:
+            return EMPTY_IMAGES[self.image_format]
+        if not all(ENGAGEMENT_FIELDS <= row.keys() for row in metrics):
+            logger.warning("Engagement chart skipped: metrics need %s", sorted(ENGAGEMENT_FIELDS))
+            return b""
+        
+        n = len(metrics)
+        features = engagement_data.get('feature_usage', {})
+        funnel = engagement_data.get('conversion_funnel', {})
+        try:
+            dates = _parse_dates([m['date'] for m in metrics])
+            active_users = np.fromiter((m['active_users'] for m in metrics), dtype=np.float64, count=n)
+            session_durations = np.fromiter((m['avg_session_duration'] for m in metrics), dtype=np.float64, count=n)
+            usage = np.fromiter(features.values(), dtype=np.float64, count=len(features))
+            conversions = np.fromiter(funnel.values(), dtype=np.float64, count=len(funnel))
+        except (TypeError, ValueError):
+            logger.warning("Engagement chart skipped: unparseable dates or non-numeric metrics")
+            return b""
+        
+        fig, canvas, axes = self._get_fig(2, 2, (12, 10))
+        
+        # User activity over time
+        axes[0, 0].plot(dates, active_users, color='green')
+        axes[0, 0].set_title('Active Users')
+        axes[0, 0].grid(True, alpha=0.3)
+        
+        # Session duration: one filled step path instead of a patch per bin.
+        # Patches (zorder 1) rasterize in vector output; text and spines stay vector.
+        counts, edges = _histogram(session_durations, 20)
+        axes[0, 1].stairs(counts, edges, fill=True, color='orange', alpha=0.7)
+        axes[0, 1].set_rasterization_zorder(PATCH_RASTER_ZORDER)
+        axes[0, 1].set_title('Session Duration Distribution')
+        
+        # Feature usage
+        axes[1, 0].bar(list(features.keys()), usage)
+        axes[1, 0].set_rasterization_zorder(PATCH_RASTER_ZORDER)
+        axes[1, 0].set_title('Feature Usage')
+        axes[1, 0].tick_params(axis='x', rotation=45)
+        
+        # Conversion funnel
+        axes[1, 1].plot(list(funnel.keys()), conversions, marker='s', linewidth=2)
+        axes[1, 1].set_title('Conversion Funnel')
+        axes[1, 1].grid(True, alpha=0.3)
+        
+        fig.tight_layout()
+        
+        return self._render(fig, canvas)
+    
+    async def generate_booking_trends_chart_async(self, data: List[Dict]) -> str:
+        """Render the booking trends chart in the shared process pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), _render_booking_trends, data, self._options)
+    
+    async def generate_revenue_chart_async(self, revenue_data: Dict) -> str:
+        """Render the revenue charts in the shared process pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), _render_revenue, revenue_data, self._options)
+    
+    async def generate_user_engagement_chart_async(self, engagement_data: Dict) -> str:
+        """Render the user engagement chart in the shared process pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), _render_user_engagement, engagement_data, self._options)
+
+# Process pool for off-thread rendering. Agg holds the GIL while drawing, so
+# concurrent charts only overlap when each renders in its own process. Workers
+# are spawned rather than forked: the parent may already be running thread
+# pools (numba, BLAS) that do not survive a fork.
+_POOL: Optional[ProcessPoolExecutor] = None
+_WORKER_GENERATORS: Dict[tuple, ChartGenerator] = {}
+
+def _warmup_font_cache():
+    """Draw a throwaway figure so font lookup happens before the first request"""
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot([0, 1], [0, 1])
+    ax.set_title('warmup')
+    canvas.draw()
+
+def _worker_init():
+    """Process pool initializer: pin the Agg backend and warm the font cache"""
+    matplotlib.use("Agg")
+    _warmup_font_cache()
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the shared render pool on first use"""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_worker_init
+        )
+    return _POOL
+
+def _worker_generator(options: Dict) -> ChartGenerator:
+    """Per-process ChartGenerator, so cached figures survive across tasks"""
+    key = tuple(sorted(options.items()))
+    generator = _WORKER_GENERATORS.get(key)
+    if generator is None:
+        generator = ChartGenerator(**options)
+        _WORKER_GENERATORS[key] = generator
+    return generator
+
+def _render_booking_trends(data: List[Dict], options: Dict) -> str:
+    return _worker_generator(options).generate_booking_trends_chart(data)
+
+def _render_revenue(revenue_data: Dict, options: Dict) -> str:
+    return _worker_generator(options).generate_revenue_chart(revenue_data)
+
+def _render_user_engagement(engagement_data: Dict, options: Dict) -> str:
+    return _worker_generator(options).generate_user_engagement_chart(engagement_data)
+
+# Module-level API (re-exported by the analytics package)
+_DEFAULT_GENERATOR: Optional[ChartGenerator] = None
+
+def _default_generator() -> ChartGenerator:
+    global _DEFAULT_GENERATOR
+    if _DEFAULT_GENERATOR is None:
+        _DEFAULT_GENERATOR = ChartGenerator()
+    return _DEFAULT_GENERATOR
+
+def generate_booking_trends_chart(data: List[Dict]) -> str:
+    """Generate booking trends chart with default settings"""
+    return _default_generator().generate_booking_trends_chart(data)
+
+def generate_revenue_chart(revenue_data: Dict) -> str:
+    """Generate revenue charts with default settings"""
+    return _default_generator().generate_revenue_chart(revenue_data)
+
+def generate_user_engagement_chart(engagement_data: Dict) -> str:
+    """Generate user engagement chart with default settings"""
+    return _default_generator().generate_user_engagement_chart(engagement_data)
+
+def render_booking_trends_chart(data: List[Dict]) -> bytes:
+    """Render booking trends chart to PNG bytes with default settings"""
+    return _default_generator().render_booking_trends_chart(data)
+
+def render_revenue_chart(revenue_data: Dict) -> bytes:
+    """Render revenue charts to PNG bytes with default settings"""
+    return _default_generator().render_revenue_chart(revenue_data)
+
+def render_user_engagement_chart(engagement_data: Dict) -> bytes:
+    """Render user engagement chart to PNG bytes with default settings"""
+    return _default_generator().render_user_engagement_chart(engagement_data)
+
+async def generate_all(booking_data: List[Dict], revenue_data: Dict, engagement_data: Dict) -> List[str]:
+    """
+    Render the three dashboard charts concurrently in the process pool
+    
+    Returns:
+        [booking_trends, revenue, user_engagement] data URIs
+    """
+    generator = _default_generator()
+    return await asyncio.gather(
+        generator.generate_booking_trends_chart_async(booking_data),
+        generator.generate_revenue_chart_async(revenue_data),
+        generator.generate_user_engagement_chart_async(engagement_data)
+    )
+
+# Pay the font scan at import instead of on the first request
+_warmup_font_cache()
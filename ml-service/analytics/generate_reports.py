@@ -5,23 +5,139 @@ Generates comprehensive analytics reports from event data
 
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import hashlib
 import json
+import logging
 import sys
 import os
+import threading
+
+# Polars is optional: when installed, event frames are built and aggregated
+# with it (multi-threaded, Arrow-backed); otherwise pandas is used
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from analytics._kernels import summary_reductions
+
+logger = logging.getLogger(__name__)
+
 try:
     from analytics.chart_generator import ChartGenerator
     from analytics.insights_engine import InsightsEngine
 except ImportError:
     # Fallback if modules aren't available
-    print("Note: ChartGenerator and InsightsEngine not found, using basic functionality")
+    logger.info("ChartGenerator and InsightsEngine not found, using basic functionality")
+
+# Event fields read by the report and the insights engine; Parquet/Arrow
+# sources are loaded with just these columns
+EVENT_COLUMNS = frozenset((
+    'id', 'name', 'event_name', 'category', 'event_type', 'status',
+    'date', 'start_date', 'createdAt', 'timestamp', 'event_date',
+    'revenue', 'total_amount', 'price', 'ticket_sales', 'ticket_price', 'cost',
+    'attendees', 'participants', 'ticket_count', 'capacity_filled', 'capacity', 'rating'
+))
+
+# Record lists longer than this are converted to a pandas frame chunk by chunk
+STREAM_CHUNK_SIZE = 100_000
+
+# Weekday names as produced for _dow, in calendar order
+_DOW_ORDER = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Recommendation priority -> sort rank (highest first)
+PRIORITY_RANK = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
+
+# Template sections (see _load_report_templates) that need each of the costlier
+# report parts; parts no section of the requested report_type needs are skipped
+SUMMARY_SECTIONS = frozenset(('summary', 'metrics', 'revenue', 'executive_summary'))
+ANALYSIS_SECTIONS = frozenset(('metrics', 'trends', 'recommendations', 'revenue', 'expenses',
+                               'profitability', 'executive_summary', 'detailed_analysis', 'action_items'))
+INSIGHT_SECTIONS = frozenset(('trends', 'recommendations', 'forecast', 'insights',
+                              'detailed_analysis', 'action_items'))
+FORECAST_SECTIONS = frozenset(('forecast', 'detailed_analysis'))
+CHART_SECTIONS = frozenset(('trends', 'activity', 'revenue', 'detailed_analysis'))
+
+# Event statuses counted towards the success rate
+SUCCESS_STATUSES = frozenset(('completed', 'successful', 'published', 'active'))
+
+# Bucket edges for the distributions below. np.histogram bins are half-open
+# [a, b) except the last, so the 100% edges are nudged up to keep exactly 100
+# in the inclusive 'medium_roi' / 'optimal' buckets
+RATING_BINS = np.array([-np.inf, 1.5, 2.5, 3.5, 4.5, np.inf])
+ROI_BINS = np.array([-np.inf, 0, 20, np.nextafter(100, np.inf), np.inf])
+UTILIZATION_BINS = np.array([-np.inf, 80, np.nextafter(100, np.inf), np.inf])
+
+# One worker per chart. Kept for the process lifetime so worker threads (and the
+# chart generator's per-thread output buffers) are reused across reports
+_CHART_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix='report-charts')
+
+# Finished reports kept per ReportGenerator instance
+REPORT_CACHE_SIZE = 32
+
+def _canonical_json(value: Any) -> bytes:
+    """Key-sorted JSON encoding of a report input, used for cache keys"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        except TypeError:
+            pass
+    return json.dumps(value, sort_keys=True, default=str).encode()
+
+def _source_cache_key(source: Any) -> Any:
+    """Cache identity of the event source: the records themselves, or a Parquet
+    file's path/mtime/size. None (not cacheable) for in-memory tables or unreadable paths"""
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return ['parquet', os.fspath(source), stat.st_mtime_ns, stat.st_size]
+    if isinstance(source, list):
+        return source
+    return None
+
+def _report_cache_key(*inputs: Any) -> bytes:
+    """blake2b digest identifying a report by everything it is computed from"""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in inputs:
+        digest.update(_canonical_json(value))
+        digest.update(b'\0')
+    return digest.digest()
+
+def _stamp_metadata(metadata: Dict) -> Dict:
+    """Set a report's ID and generation time; cached reports get fresh ones on every return"""
+    now = datetime.now()
+    metadata['report_id'] = f'report_{int(now.timestamp())}'
+    metadata['generated_at'] = now.isoformat()
+    return metadata
 
 class ReportGenerator:
+    # Fixed attribute set; every slot is assigned in __init__
+    __slots__ = ('chart_generator', 'insights_engine', 'report_templates', '_report_cache', '_cache_lock')
+    
     def __init__(self):
         """Initialize report generator with components"""
         try:
@@ -32,6 +148,9 @@ class ReportGenerator:
             self.insights_engine = None
             
         self.report_templates = self._load_report_templates()
+        # input digest -> successful report result, LRU ordered
+        self._report_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def _load_report_templates(self) -> Dict:
         """Load report templates"""
@@ -55,7 +174,7 @@ class ReportGenerator:
         }
     
     def generate_event_analytics_report(self, 
-                                      event_data: List[Dict], 
+                                      event_data: Union[List[Dict], str], 
                                       user_data: List[Dict] = None,
                                       report_type: str = 'comprehensive',
                                       include_charts: bool = True) -> Dict:
@@ -63,7 +182,7 @@ class ReportGenerator:
         Generate comprehensive event analytics report
         
         Args:
-            event_data: List of event dictionaries
+            event_data: List of event dictionaries, a Parquet file path or a pyarrow Table
             user_data: Optional user engagement data
             report_type: Type of report to generate
             include_charts: Whether to include chart data
@@ -71,19 +190,41 @@ class ReportGenerator:
         Returns:
             Dictionary containing complete report
         """
-        print(f"Generating {report_type} analytics report for {len(event_data)} events...")
+        # Reports are deterministic in their inputs; serve unchanged data from cache
+        source_key = _source_cache_key(event_data)
+        cache_key = None
+        if source_key is not None:
+            cache_key = _report_cache_key(report_type, include_charts, source_key, user_data)
+            with self._cache_lock:
+                cached = self._report_cache.get(cache_key)
+                if cached is not None:
+                    self._report_cache.move_to_end(cache_key)
+            if cached is not None:
+                # report['metadata'] and metadata are one dict, in the copy too
+                result = copy.deepcopy(cached)
+                _stamp_metadata(result['metadata'])
+                return result
+        
+        # Unknown report types get every section
+        template = self.report_templates.get(report_type)
+        needed = frozenset(template['sections']) if template else None
+        
+        def wants(sections: frozenset) -> bool:
+            return needed is None or not needed.isdisjoint(sections)
         
         try:
-            # Convert to DataFrame
-            df_events = pd.DataFrame(event_data)
+            # Convert to DataFrame and parse the date column once for all helpers
+            df_events = self._prepare_dataframe(self._to_frame(event_data))
+            event_count = len(df_events)
+            
+            logger.info("Generating %s analytics report for %d events", report_type, event_count)
             
             # Initialize report structure
             report = {
                 'metadata': {
-                    'report_id': f'report_{int(datetime.now().timestamp())}',
-                    'generated_at': datetime.now().isoformat(),
+                    **_stamp_metadata({}),
                     'report_type': report_type,
-                    'event_count': len(event_data),
+                    'event_count': event_count,
                     'time_period': self._detect_time_period(df_events)
                 },
                 'summary': {},
@@ -93,27 +234,39 @@ class ReportGenerator:
                 'charts': {}
             }
             
+            # Group by category once; summary, analysis and the revenue chart share it
+            want_charts = (include_charts and self.chart_generator and event_count > 0
+                           and wants(CHART_SECTIONS))
+            category_stats = []
+            if 'category' in df_events.columns and (
+                    want_charts or wants(SUMMARY_SECTIONS) or wants(ANALYSIS_SECTIONS)):
+                category_stats = self._aggregate_by_category(df_events)
+            
             # Generate summary statistics
-            report['summary'] = self._generate_summary_statistics(df_events)
+            if wants(SUMMARY_SECTIONS):
+                report['summary'] = self._generate_summary_statistics(df_events, category_stats)
             
             # Generate detailed analysis
-            report['analysis'] = self._generate_detailed_analysis(df_events)
+            if wants(ANALYSIS_SECTIONS):
+                report['analysis'] = self._generate_detailed_analysis(df_events, category_stats)
             
             # Generate insights if engine available
-            if self.insights_engine:
-                report['insights'] = self.insights_engine.analyze_event_performance(event_data)
+            if self.insights_engine and wants(INSIGHT_SECTIONS):
+                # The engine works on records; only Parquet/Arrow sources need converting
+                event_records = event_data if isinstance(event_data, list) else self._frame_records(df_events)
+                report['insights'] = self.insights_engine.analyze_event_performance(event_records)
                 
                 # Add predictions
-                if len(event_data) >= 10:  # Need sufficient data for predictions
-                    predictions = self.insights_engine.predict_future_performance(event_data)
+                if event_count >= 10 and wants(FORECAST_SECTIONS):  # Need sufficient data for predictions
+                    predictions = self.insights_engine.predict_future_performance(event_records)
                     report['insights']['predictions'] = predictions
             
             # Generate recommendations
             report['recommendations'] = self._generate_recommendations(report['analysis'], report['insights'])
             
             # Generate charts if requested and generator available
-            if include_charts and self.chart_generator and len(event_data) > 0:
-                report['charts'] = self._generate_charts(df_events, user_data)
+            if want_charts:
+                report['charts'] = self._generate_charts(df_events, user_data, category_stats)
             
             # Add executive summary
             report['executive_summary'] = self._generate_executive_summary(report)
@@ -121,18 +274,25 @@ class ReportGenerator:
             # Calculate report confidence score
             report['metadata']['confidence_score'] = self._calculate_confidence_score(report)
             
-            print(f"✅ Report generated successfully (confidence: {report['metadata']['confidence_score']}%)")
+            logger.info("Report generated (confidence: %s%%)", report['metadata']['confidence_score'])
             
-            return {
+            result = {
                 'success': True,
                 'report': report,
                 'metadata': report['metadata']
             }
             
+            if cache_key is not None:
+                cached = copy.deepcopy(result)
+                with self._cache_lock:
+                    self._report_cache[cache_key] = cached
+                    if len(self._report_cache) > REPORT_CACHE_SIZE:
+                        self._report_cache.popitem(last=False)
+            
+            return result
+            
         except Exception as e:
-            print(f"❌ Error generating report: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error generating report")
             
             return {
                 'success': False,
@@ -150,6 +310,94 @@ class ReportGenerator:
                 }
             }
     
+    def _to_frame(self, source: Union[List[Dict], str]):
+        """
+        Build the event frame with polars when available, pandas otherwise.
+        Parquet paths and Arrow tables are read columnar, projected to EVENT_COLUMNS,
+        without going through per-row dicts. Large record lists are converted in
+        chunks when pandas is used.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            if POLARS_AVAILABLE:
+                columns = [col for col in pl.read_parquet_schema(source) if col in EVENT_COLUMNS]
+                return pl.read_parquet(source, columns=columns)
+            if not PYARROW_AVAILABLE:
+                raise ImportError("Reading Parquet event data requires polars or pyarrow")
+            columns = [col for col in pq.read_schema(source).names if col in EVENT_COLUMNS]
+            return pq.read_table(source, columns=columns).to_pandas()
+        
+        if PYARROW_AVAILABLE and isinstance(source, pa.Table):
+            table = source.select([col for col in source.column_names if col in EVENT_COLUMNS])
+            return pl.from_arrow(table) if POLARS_AVAILABLE else table.to_pandas()
+        
+        records = source
+        if POLARS_AVAILABLE:
+            # from_dicts cannot infer a schema from an empty list
+            return pl.from_dicts(records, infer_schema_length=None) if records else pl.DataFrame()
+        if len(records) > STREAM_CHUNK_SIZE:
+            return self._frame_from_chunks(records, STREAM_CHUNK_SIZE)
+        return pd.DataFrame(records)
+    
+    def _frame_from_chunks(self, records: List[Dict], chunk_size: int) -> pd.DataFrame:
+        """
+        pandas frame of a large record list, built chunk_size rows at a time and
+        projected to EVENT_COLUMNS, so the object-dtype intermediate pandas
+        creates from dicts never spans the whole list or unused fields
+        """
+        chunks = []
+        for start in range(0, len(records), chunk_size):
+            chunk = pd.DataFrame(records[start:start + chunk_size])
+            chunks.append(chunk[[col for col in chunk.columns if col in EVENT_COLUMNS]])
+        return pd.concat(chunks, ignore_index=True, sort=False)
+    
+    def _frame_records(self, df) -> List[Dict]:
+        """Rows of an event frame as dicts"""
+        return df.to_dicts() if POLARS_AVAILABLE else df.to_dict('records')
+    
+    def _pl_dates(self, df, col: str):
+        """Polars expression parsing ``col`` to datetimes (no-op cast if already temporal)"""
+        if df.schema[col] == pl.Utf8:
+            return pl.col(col).str.to_datetime()
+        return pl.col(col).cast(pl.Datetime)
+    
+    def _prepare_dataframe(self, df):
+        """
+        Parse the first usable date column once and derive the calendar columns
+        the helpers group by: _ts (datetime), _month_num, _month_str ('%Y-%m')
+        and _dow (weekday name). Frames without a parseable date are returned as-is.
+        """
+        # Try different date column names
+        date_columns = ['date', 'start_date', 'createdAt', 'timestamp', 'event_date']
+        
+        for col in date_columns:
+            if col not in df.columns:
+                continue
+            try:
+                if POLARS_AVAILABLE:
+                    ts = df.select(self._pl_dates(df, col).alias('_ts')).to_series()
+                    if ts.null_count() == len(ts):
+                        continue
+                    return df.with_columns(
+                        ts,
+                        ts.dt.month().alias('_month_num'),
+                        ts.dt.strftime('%Y-%m').alias('_month_str'),
+                        ts.dt.strftime('%A').alias('_dow')
+                    )
+                
+                # cache=True parses each distinct date string only once
+                ts = pd.to_datetime(df[col], errors='coerce', cache=True)
+                if ts.isna().all():
+                    continue
+                df['_ts'] = ts
+                df['_month_num'] = ts.dt.month
+                df['_month_str'] = ts.dt.strftime('%Y-%m')
+                df['_dow'] = ts.dt.day_name()
+                return df
+            except Exception:
+                continue
+        
+        return df
+    
     def _detect_time_period(self, df: pd.DataFrame) -> Dict:
         """Detect the time period covered by the data"""
         time_period = {
@@ -158,23 +406,15 @@ class ReportGenerator:
             'duration_days': 0
         }
         
-        # Try different date column names
-        date_columns = ['date', 'start_date', 'createdAt', 'timestamp', 'event_date']
-        
-        for col in date_columns:
-            if col in df.columns:
-                try:
-                    df[col] = pd.to_datetime(df[col])
-                    time_period['start'] = df[col].min().isoformat()
-                    time_period['end'] = df[col].max().isoformat()
-                    time_period['duration_days'] = (df[col].max() - df[col].min()).days
-                    break
-                except:
-                    continue
+        if '_ts' in df.columns:
+            start, end = df['_ts'].min(), df['_ts'].max()
+            time_period['start'] = start.isoformat()
+            time_period['end'] = end.isoformat()
+            time_period['duration_days'] = (end - start).days
         
         return time_period
     
-    def _generate_summary_statistics(self, df: pd.DataFrame) -> Dict:
+    def _generate_summary_statistics(self, df: pd.DataFrame, category_stats: List[Dict] = None) -> Dict:
         """Generate summary statistics from event data"""
         summary = {
             'total_events': len(df),
@@ -185,50 +425,62 @@ class ReportGenerator:
             'top_performing_category': None
         }
         
-        # Calculate revenue if available
+        # Revenue, attendees and ratings are reduced together in one pass
         revenue_columns = ['revenue', 'total_amount', 'price', 'ticket_sales']
-        for col in revenue_columns:
-            if col in df.columns:
-                summary['total_revenue'] = float(df[col].sum())
-                summary['average_revenue_per_event'] = float(df[col].mean())
-                break
+        attendee_columns = ['attendees', 'participants', 'ticket_count', 'capacity_filled']
+        revenue_col = next((col for col in revenue_columns if col in df.columns), None)
+        attendee_col = next((col for col in attendee_columns if col in df.columns), None)
+        rating_col = 'rating' if 'rating' in df.columns else None
+        
+        sums, means, rating_hist = summary_reductions(
+            self._column_values(df, revenue_col),
+            self._column_values(df, attendee_col),
+            self._column_values(df, rating_col),
+            RATING_BINS
+        )
+        
+        # Calculate revenue if available
+        if revenue_col:
+            summary['total_revenue'] = float(sums[0])
+            summary['average_revenue_per_event'] = float(means[0])
         
         # Calculate attendees if available
-        attendee_columns = ['attendees', 'participants', 'ticket_count', 'capacity_filled']
-        for col in attendee_columns:
-            if col in df.columns:
-                summary['total_attendees'] = int(df[col].sum())
-                summary['average_attendees_per_event'] = float(df[col].mean())
-                break
+        if attendee_col:
+            summary['total_attendees'] = int(sums[1])
+            summary['average_attendees_per_event'] = float(means[1])
         
         # Calculate ratings if available
-        if 'rating' in df.columns:
-            summary['average_rating'] = float(df['rating'].mean())
+        if rating_col:
+            summary['average_rating'] = float(means[2])
+            one, two, three, four, five = rating_hist
             summary['rating_distribution'] = {
-                '5_star': int((df['rating'] >= 4.5).sum()),
-                '4_star': int(((df['rating'] >= 3.5) & (df['rating'] < 4.5)).sum()),
-                '3_star': int(((df['rating'] >= 2.5) & (df['rating'] < 3.5)).sum()),
-                '2_star': int(((df['rating'] >= 1.5) & (df['rating'] < 2.5)).sum()),
-                '1_star': int((df['rating'] < 1.5).sum())
+                '5_star': int(five),
+                '4_star': int(four),
+                '3_star': int(three),
+                '2_star': int(two),
+                '1_star': int(one)
             }
         
         # Calculate success rate based on status or completion
         if 'status' in df.columns:
-            success_statuses = ['completed', 'successful', 'published', 'active']
-            summary['success_rate'] = float((df['status'].isin(success_statuses)).mean() * 100)
+            if POLARS_AVAILABLE:
+                is_success = df['status'].is_in(list(SUCCESS_STATUSES)).fill_null(False).to_numpy()
+            else:
+                # One set lookup per distinct status, then a gather over the integer
+                # codes; the trailing False is what code -1 (missing status) picks
+                statuses = pd.Categorical(df['status'])
+                is_success = np.append(statuses.categories.isin(SUCCESS_STATUSES), False)[statuses.codes]
+            summary['success_rate'] = float(is_success.mean() * 100)
         
         # Find top performing category
         if 'category' in df.columns:
-            category_stats = df.groupby('category').agg({
-                'revenue': 'sum' if 'revenue' in df.columns else None,
-                'attendees': 'sum' if 'attendees' in df.columns else None,
-                'rating': 'mean' if 'rating' in df.columns else None
-            }).reset_index()
+            if category_stats is None:
+                category_stats = self._aggregate_by_category(df)
             
-            if not category_stats.empty:
+            if category_stats:
                 # Find category with highest revenue or attendees
-                if 'revenue' in category_stats.columns:
-                    top_category = category_stats.loc[category_stats['revenue'].idxmax()]
+                if 'revenue' in category_stats[0]:
+                    top_category = max(category_stats, key=lambda row: row['revenue'])
                     summary['top_performing_category'] = {
                         'category': top_category['category'],
                         'revenue': float(top_category['revenue']),
@@ -237,7 +489,26 @@ class ReportGenerator:
         
         return summary
     
-    def _generate_detailed_analysis(self, df: pd.DataFrame) -> Dict:
+    def _column_values(self, df, col: Optional[str]) -> Optional[np.ndarray]:
+        """Column as a float64 array with NaN for missing values (None if no column)"""
+        if col is None:
+            return None
+        if POLARS_AVAILABLE:
+            return df[col].cast(pl.Float64).to_numpy()
+        return df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    def _aggregate_by_category(self, df) -> List[Dict]:
+        """Per-category revenue/attendee totals and mean rating, one record per category"""
+        aggregations = {col: how for col, how in (('revenue', 'sum'), ('attendees', 'sum'), ('rating', 'mean'))
+                        if col in df.columns}
+        
+        if POLARS_AVAILABLE:
+            exprs = [getattr(pl.col(col), how)() for col, how in aggregations.items()]
+            return df.group_by('category').agg(exprs).sort('category').to_dicts()
+        
+        return df.groupby('category').agg(aggregations).reset_index().to_dict('records')
+    
+    def _generate_detailed_analysis(self, df: pd.DataFrame, category_stats: List[Dict] = None) -> Dict:
         """Generate detailed analysis from event data"""
         analysis = {
             'temporal_analysis': {},
@@ -246,83 +517,169 @@ class ReportGenerator:
             'performance_metrics': {}
         }
         
-        # Temporal analysis (if date column exists)
-        date_columns = ['date', 'start_date', 'createdAt']
-        for col in date_columns:
-            if col in df.columns:
-                try:
-                    df['date_parsed'] = pd.to_datetime(df[col])
-                    df['month'] = df['date_parsed'].dt.month
-                    df['day_of_week'] = df['date_parsed'].dt.day_name()
-                    
-                    # Monthly trends
-                    monthly_trends = df.groupby('month').agg({
-                        'revenue': 'sum' if 'revenue' in df.columns else None,
-                        'attendees': 'sum' if 'attendees' in df.columns else None
-                    }).reset_index()
-                    
-                    analysis['temporal_analysis']['monthly_trends'] = monthly_trends.to_dict('records')
-                    
-                    # Day of week analysis
-                    dow_analysis = df.groupby('day_of_week').size().reset_index(name='count')
-                    analysis['temporal_analysis']['day_of_week_distribution'] = dow_analysis.to_dict('records')
-                    
-                    break
-                except:
-                    continue
+        # Temporal analysis (if a date column was parsed)
+        if '_ts' in df.columns:
+            sums = [c for c in ('revenue', 'attendees') if c in df.columns]
+            
+            if POLARS_AVAILABLE:
+                dated = df.filter(pl.col('_ts').is_not_null())
+                
+                # Monthly trends
+                monthly_trends = (dated.group_by(pl.col('_month_num').alias('month'))
+                                  .agg([pl.col(c).sum() for c in sums])
+                                  .sort('month'))
+                analysis['temporal_analysis']['monthly_trends'] = monthly_trends.to_dicts()
+                
+                # Day of week analysis
+                dow_analysis = (dated.group_by(pl.col('_dow').alias('day_of_week'))
+                                .agg(pl.len().alias('count'), pl.col('_ts').dt.weekday().first().alias('weekday'))
+                                .sort('weekday')
+                                .drop('weekday'))
+                analysis['temporal_analysis']['day_of_week_distribution'] = dow_analysis.to_dicts()
+            else:
+                # Monthly trends
+                monthly_trends = df.groupby('_month_num')[sums].sum().rename_axis('month').reset_index()
+                analysis['temporal_analysis']['monthly_trends'] = monthly_trends.to_dict('records')
+                
+                # Day of week analysis
+                # Counting the weekday codes yields the counts already in calendar order
+                codes = pd.Categorical(df['_dow'], categories=_DOW_ORDER).codes
+                counts = np.bincount(codes[codes >= 0], minlength=len(_DOW_ORDER))
+                analysis['temporal_analysis']['day_of_week_distribution'] = [
+                    {'day_of_week': day, 'count': int(count)}
+                    for day, count in zip(_DOW_ORDER, counts) if count
+                ]
         
         # Category analysis
         if 'category' in df.columns:
-            category_stats = df.groupby('category').agg({
-                'revenue': 'sum' if 'revenue' in df.columns else None,
-                'attendees': 'sum' if 'attendees' in df.columns else None,
-                'rating': 'mean' if 'rating' in df.columns else None
-            }).reset_index()
-            
-            analysis['category_analysis'] = category_stats.to_dict('records')
+            if category_stats is None:
+                category_stats = self._aggregate_by_category(df)
+            analysis['category_analysis'] = category_stats
+        
+        if POLARS_AVAILABLE:
+            analysis['financial_analysis'], analysis['performance_metrics'] = self._financial_metrics_polars(df)
+            return analysis
+        
+        # Derived columns are local arrays used only for the reductions below;
+        # nothing is attached to df. NaN ratios count as 0 (as fillna(0) did),
+        # while x/0 stays +/-inf
+        has_financials = 'revenue' in df.columns and 'cost' in df.columns
+        
+        if has_financials:
+            revenue = self._column_values(df, 'revenue')
+            cost = self._column_values(df, 'cost')
+            profit = revenue - cost
+            with np.errstate(divide='ignore', invalid='ignore'):
+                profit_margin = profit / revenue * 100
+                roi = profit / cost * 100
+            profit_margin[np.isnan(profit_margin)] = 0
+            roi[np.isnan(roi)] = 0
         
         # Financial analysis
-        if 'revenue' in df.columns and 'cost' in df.columns:
-            df['profit'] = df['revenue'] - df['cost']
-            df['profit_margin'] = (df['profit'] / df['revenue'] * 100).fillna(0)
-            
+        if has_financials:
             analysis['financial_analysis'] = {
-                'total_revenue': float(df['revenue'].sum()),
-                'total_cost': float(df['cost'].sum()),
-                'total_profit': float(df['profit'].sum()),
-                'average_profit_margin': float(df['profit_margin'].mean()),
-                'profitable_events': int((df['profit'] > 0).sum()),
-                'loss_making_events': int((df['profit'] < 0).sum())
+                'total_revenue': float(np.nansum(revenue)),
+                'total_cost': float(np.nansum(cost)),
+                'total_profit': float(np.nansum(profit)),
+                'average_profit_margin': float(profit_margin.mean()),
+                'profitable_events': int((profit > 0).sum()),
+                'loss_making_events': int((profit < 0).sum())
             }
         
         # Performance metrics
         performance_metrics = {}
         
         # ROI calculation if cost and revenue available
-        if 'revenue' in df.columns and 'cost' in df.columns:
-            df['roi'] = ((df['revenue'] - df['cost']) / df['cost'] * 100).fillna(0)
-            performance_metrics['average_roi'] = float(df['roi'].mean())
+        if has_financials:
+            performance_metrics['average_roi'] = float(roi.mean())
+            negative, low, medium, high = np.histogram(roi, bins=ROI_BINS)[0]
             performance_metrics['roi_distribution'] = {
-                'high_roi': int((df['roi'] > 100).sum()),
-                'medium_roi': int(((df['roi'] >= 20) & (df['roi'] <= 100)).sum()),
-                'low_roi': int(((df['roi'] >= 0) & (df['roi'] < 20)).sum()),
-                'negative_roi': int((df['roi'] < 0).sum())
+                'high_roi': int(high),
+                'medium_roi': int(medium),
+                'low_roi': int(low),
+                'negative_roi': int(negative)
             }
         
         # Capacity utilization if capacity and attendees available
         if 'capacity' in df.columns and 'attendees' in df.columns:
-            df['capacity_utilization'] = (df['attendees'] / df['capacity'] * 100).fillna(0)
-            performance_metrics['average_capacity_utilization'] = float(df['capacity_utilization'].mean())
+            with np.errstate(divide='ignore', invalid='ignore'):
+                capacity_utilization = self._column_values(df, 'attendees') / self._column_values(df, 'capacity') * 100
+            capacity_utilization[np.isnan(capacity_utilization)] = 0
+            performance_metrics['average_capacity_utilization'] = float(capacity_utilization.mean())
+            underutilized, optimal, overbooked = np.histogram(capacity_utilization, bins=UTILIZATION_BINS)[0]
             performance_metrics['utilization_distribution'] = {
-                'overbooked': int((df['capacity_utilization'] > 100).sum()),
-                'optimal': int(((df['capacity_utilization'] >= 80) & (df['capacity_utilization'] <= 100)).sum()),
-                'underutilized': int((df['capacity_utilization'] < 80).sum())
+                'overbooked': int(overbooked),
+                'optimal': int(optimal),
+                'underutilized': int(underutilized)
             }
         
         analysis['performance_metrics'] = performance_metrics
         
         return analysis
     
+    def _financial_metrics_polars(self, df) -> tuple:
+        """Financial analysis and performance metrics as one parallel polars select"""
+        financial_analysis = {}
+        performance_metrics = {}
+        exprs = []
+        
+        has_financials = 'revenue' in df.columns and 'cost' in df.columns
+        has_capacity = 'capacity' in df.columns and 'attendees' in df.columns
+        
+        if has_financials:
+            profit = pl.col('revenue') - pl.col('cost')
+            margin = (profit / pl.col('revenue') * 100).fill_nan(0).fill_null(0)
+            roi = (profit / pl.col('cost') * 100).fill_nan(0).fill_null(0)
+            exprs += [
+                pl.col('revenue').sum().alias('total_revenue'),
+                pl.col('cost').sum().alias('total_cost'),
+                profit.sum().alias('total_profit'),
+                margin.mean().alias('average_profit_margin'),
+                (profit > 0).sum().alias('profitable_events'),
+                (profit < 0).sum().alias('loss_making_events'),
+                roi.mean().alias('average_roi'),
+                (roi > 100).sum().alias('high_roi'),
+                ((roi >= 20) & (roi <= 100)).sum().alias('medium_roi'),
+                ((roi >= 0) & (roi < 20)).sum().alias('low_roi'),
+                (roi < 0).sum().alias('negative_roi'),
+            ]
+        
+        if has_capacity:
+            utilization = (pl.col('attendees') / pl.col('capacity') * 100).fill_nan(0).fill_null(0)
+            exprs += [
+                utilization.mean().alias('average_capacity_utilization'),
+                (utilization > 100).sum().alias('overbooked'),
+                ((utilization >= 80) & (utilization <= 100)).sum().alias('optimal'),
+                (utilization < 80).sum().alias('underutilized'),
+            ]
+        
+        if not exprs:
+            return financial_analysis, performance_metrics
+        
+        row = df.select(exprs).row(0, named=True)
+        
+        if has_financials:
+            financial_analysis = {
+                'total_revenue': float(row['total_revenue']),
+                'total_cost': float(row['total_cost']),
+                'total_profit': float(row['total_profit']),
+                'average_profit_margin': float(row['average_profit_margin'] or 0),
+                'profitable_events': int(row['profitable_events']),
+                'loss_making_events': int(row['loss_making_events'])
+            }
+            performance_metrics['average_roi'] = float(row['average_roi'] or 0)
+            performance_metrics['roi_distribution'] = {
+                key: int(row[key]) for key in ('high_roi', 'medium_roi', 'low_roi', 'negative_roi')
+            }
+        
+        if has_capacity:
+            performance_metrics['average_capacity_utilization'] = float(row['average_capacity_utilization'] or 0)
+            performance_metrics['utilization_distribution'] = {
+                key: int(row[key]) for key in ('overbooked', 'optimal', 'underutilized')
+            }
+        
+        return financial_analysis, performance_metrics
+    
     def _generate_recommendations(self, analysis: Dict, insights: Dict) -> List[Dict]:
         """Generate actionable recommendations based on analysis and insights"""
         recommendations = []
@@ -399,64 +756,93 @@ class ReportGenerator:
                 })
         
         # Sort by priority
-        priority_order = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
-        recommendations.sort(key=lambda x: priority_order.get(x['priority'], 0), reverse=True)
+        recommendations.sort(key=lambda x: PRIORITY_RANK.get(x['priority'], 0), reverse=True)
         
         return recommendations[:10]  # Return top 10 recommendations
     
-    def _generate_charts(self, df: pd.DataFrame, user_data: List[Dict] = None) -> Dict:
-        """Generate chart data for visualization"""
+    def _generate_charts(self, df: pd.DataFrame, user_data: List[Dict] = None,
+                         category_stats: List[Dict] = None) -> Dict:
+        """Generate chart data for visualization, rendering the charts concurrently"""
         charts = {}
         
-        try:
-            if self.chart_generator:
-                # Generate booking trends chart
-                if 'date' in df.columns and 'attendees' in df.columns:
-                    try:
-                        df['date'] = pd.to_datetime(df['date'])
-                        chart_data = df[['date', 'attendees']].copy()
-                        chart_data = chart_data.sort_values('date')
-                        
-                        charts['booking_trends'] = self.chart_generator.generate_booking_trends_chart(
-                            chart_data.to_dict('records')
-                        )
-                    except:
-                        pass
-                
-                # Generate revenue chart if revenue data available
-                if 'revenue' in df.columns:
-                    try:
-                        revenue_data = {
-                            'sources': self._extract_revenue_sources(df),
-                            'monthly': self._extract_monthly_revenue(df)
-                        }
-                        charts['revenue_analysis'] = self.chart_generator.generate_revenue_chart(revenue_data)
-                    except:
-                        pass
-                
-                # Generate user engagement chart if user data provided
-                if user_data and len(user_data) > 0:
-                    try:
-                        engagement_data = {
-                            'metrics': user_data,
-                            'feature_usage': self._extract_feature_usage(user_data),
-                            'conversion_funnel': self._extract_conversion_funnel(user_data)
-                        }
-                        charts['user_engagement'] = self.chart_generator.generate_user_engagement_chart(engagement_data)
-                    except:
-                        pass
-        except Exception as e:
-            print(f"Chart generation error: {e}")
+        if not self.chart_generator:
+            return charts
+        
+        jobs = {}
+        
+        # Generate booking trends chart (attendees per date, split by event type/category)
+        type_col = next((col for col in ('event_type', 'category') if col in df.columns), None)
+        if '_ts' in df.columns and 'attendees' in df.columns and type_col:
+            jobs['booking_trends'] = _CHART_POOL.submit(self._booking_trends_job, df, type_col)
+        
+        # Generate revenue chart if revenue data available
+        if 'revenue' in df.columns:
+            jobs['revenue_analysis'] = _CHART_POOL.submit(self._revenue_chart_job, df, category_stats)
+        
+        # Generate user engagement chart if user data provided
+        if user_data and len(user_data) > 0:
+            jobs['user_engagement'] = _CHART_POOL.submit(self._engagement_job, user_data)
+        
+        for name, job in jobs.items():
+            error = job.exception()
+            if error is None:
+                charts[name] = job.result()
+            else:
+                logger.error("Chart generation failed (%s)", name, exc_info=error)
         
         return charts
     
-    def _extract_revenue_sources(self, df: pd.DataFrame) -> Dict:
+    def _booking_trends_job(self, df: pd.DataFrame, type_col: str) -> str:
+        """Booking trends chart from the date, attendees and type columns.
+
+        Columns go to the chart generator as arrays (it sorts by date itself),
+        so no per-row dicts are built.
+        """
+        if POLARS_AVAILABLE:
+            # drop_nulls() keeps NaN, which the pandas dropna() below removes
+            attendees = pl.col('attendees').cast(pl.Float64).fill_nan(None)
+            chart_data = df.select('_ts', attendees, pl.col(type_col).cast(pl.Utf8)).drop_nulls()
+            dates = chart_data['_ts'].to_numpy().astype('datetime64[s]')
+            bookings = chart_data['attendees'].to_numpy().astype(np.int64)
+            event_types = chart_data[type_col].to_numpy().astype(object)
+        else:
+            chart_data = df[['_ts', 'attendees', type_col]].dropna()
+            dates = chart_data['_ts'].to_numpy(dtype='datetime64[s]')
+            bookings = chart_data['attendees'].to_numpy(dtype=np.int64)
+            event_types = chart_data[type_col].to_numpy(dtype=object)
+        
+        return self.chart_generator.generate_booking_trends_chart_soa(dates, bookings, event_types)
+    
+    def _revenue_chart_job(self, df: pd.DataFrame, category_stats: List[Dict] = None) -> str:
+        """Revenue chart from per-category and per-month revenue"""
+        revenue_data = {
+            'sources': self._extract_revenue_sources(df, category_stats),
+            'monthly': self._extract_monthly_revenue(df)
+        }
+        return self.chart_generator.generate_revenue_chart(revenue_data)
+    
+    def _engagement_job(self, user_data: List[Dict]) -> str:
+        """User engagement chart from the raw user metrics"""
+        engagement_data = {
+            'metrics': user_data,
+            'feature_usage': self._extract_feature_usage(user_data),
+            'conversion_funnel': self._extract_conversion_funnel(user_data)
+        }
+        return self.chart_generator.generate_user_engagement_chart(engagement_data)
+    
+    def _extract_revenue_sources(self, df: pd.DataFrame, category_stats: List[Dict] = None) -> Dict:
         """Extract revenue by source/category"""
         sources = {}
         
-        if 'category' in df.columns and 'revenue' in df.columns:
-            category_revenue = df.groupby('category')['revenue'].sum()
-            for category, revenue in category_revenue.items():
+        if category_stats and 'revenue' in category_stats[0]:
+            for row in category_stats:
+                sources[row['category']] = float(row['revenue'])
+        elif 'category' in df.columns and 'revenue' in df.columns:
+            if POLARS_AVAILABLE:
+                category_revenue = df.group_by('category').agg(pl.col('revenue').sum()).sort('category').iter_rows()
+            else:
+                category_revenue = df.groupby('category')['revenue'].sum().items()
+            for category, revenue in category_revenue:
                 sources[category] = float(revenue)
         
         return sources
@@ -465,11 +851,17 @@ class ReportGenerator:
         """Extract monthly revenue"""
         monthly = {}
         
-        if 'date' in df.columns and 'revenue' in df.columns:
+        if '_month_str' in df.columns and 'revenue' in df.columns:
             try:
-                df['month'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m')
-                monthly_revenue = df.groupby('month')['revenue'].sum()
-                for month, revenue in monthly_revenue.items():
+                if POLARS_AVAILABLE:
+                    monthly_revenue = (df.filter(pl.col('_month_str').is_not_null())
+                                       .group_by('_month_str')
+                                       .agg(pl.col('revenue').sum())
+                                       .sort('_month_str')
+                                       .iter_rows())
+                else:
+                    monthly_revenue = df.groupby('_month_str')['revenue'].sum().items()
+                for month, revenue in monthly_revenue:
                     monthly[month] = float(revenue)
             except:
                 pass
@@ -507,7 +899,10 @@ class ReportGenerator:
             df_users = pd.DataFrame(user_data)
             
             if 'status' in df_users.columns:
-                status_counts = df_users['status'].value_counts()
+                statuses = pd.Categorical(df_users['status'])
+                codes = statuses.codes[statuses.codes >= 0]
+                status_counts = zip(statuses.categories,
+                                    np.bincount(codes, minlength=len(statuses.categories)))
                 
                 # Map statuses to funnel stages
                 funnel_mapping = {
@@ -517,7 +912,7 @@ class ReportGenerator:
                     'retained': 'Retained'
                 }
                 
-                for status, count in status_counts.items():
+                for status, count in status_counts:
                     if status in funnel_mapping:
                         funnel[funnel_mapping[status]] = int(count)
         
@@ -592,11 +987,20 @@ class ReportGenerator:
     def export_report(self, report: Dict, format: str = 'json') -> Dict:
         """Export report in different formats"""
         if format == 'json':
+            # Serialized once; size is the byte length of that same content
+            if ORJSON_AVAILABLE:
+                content = orjson.dumps(
+                    report,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                    default=str
+                )
+            else:
+                content = json.dumps(report, indent=2, default=str).encode()
             return {
                 'success': True,
                 'format': 'json',
-                'content': json.dumps(report, indent=2, default=str),
-                'size': len(json.dumps(report))
+                'content': content.decode(),
+                'size': len(content)
             }
         elif format == 'csv':
             # Create simplified CSV version
@@ -623,14 +1027,24 @@ class ReportGenerator:
                 'supported_formats': ['json', 'csv']
             }
 
+# Shared by the module-level API so its report cache persists across calls
+_DEFAULT_GENERATOR: Optional[ReportGenerator] = None
+
+def _default_generator() -> ReportGenerator:
+    global _DEFAULT_GENERATOR
+    if _DEFAULT_GENERATOR is None:
+        _DEFAULT_GENERATOR = ReportGenerator()
+    return _DEFAULT_GENERATOR
+
 # Main function for standalone execution
-def generate_event_analytics_report(event_data: List[Dict], user_data: List[Dict] = None) -> Dict:
+def generate_event_analytics_report(event_data: Union[List[Dict], str], user_data: List[Dict] = None) -> Dict:
     """Main function to generate event analytics report"""
-    generator = ReportGenerator()
-    return generator.generate_event_analytics_report(event_data, user_data)
+    return _default_generator().generate_event_analytics_report(event_data, user_data)
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # Sample data for testing
     sample_events = [
         {
@@ -6,16 +6,62 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Tuple
 from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 import json
 
+# Polars is optional: when installed, event performance is analyzed with it
+# (columnar, multi-threaded); otherwise pandas is used
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+def _parse_dates(dates: pd.Series) -> pd.Series:
+    """
+    Parse a date column, trying ISO-8601 first: with a known format pandas uses
+    its C parser instead of guessing per element, and cache=True parses each
+    distinct date string once. Other inputs fall back to the flexible parser.
+    """
+    try:
+        return pd.to_datetime(dates, format='ISO8601', cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(dates, cache=True)
+
+def _parse_dates_polars(dates: 'pl.Series') -> 'pl.Series':
+    """
+    Polars counterpart of _parse_dates: string dates go through polars' own
+    parser, and anything it rejects falls back to pandas, so both paths accept
+    the same inputs
+    """
+    if dates.dtype != pl.Utf8:
+        return dates.cast(pl.Datetime)
+    try:
+        return dates.str.to_datetime()
+    except pl.exceptions.PolarsError:
+        return pl.from_pandas(_parse_dates(dates.to_pandas())).alias(dates.name)
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest values, largest first, in O(n) with
+    np.argpartition. Matches DataFrame.nlargest(keep='first'): ties resolve to
+    the earliest position, and NaNs (sorted last) only fill places left over
+    """
+    keys = -values
+    if len(keys) > k:
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        if not np.isnan(kth):
+            # Everything up to the k-th key, ties included, in position order
+            candidates = np.flatnonzero(keys <= kth)
+            return candidates[np.lexsort((candidates, keys[candidates]))][:k]
+    return np.argsort(keys, kind='stable')[:k]
+
 class InsightsEngine:
-    def __init__(self):
-        self.regression_model = LinearRegression()
-        
     def analyze_event_performance(self, events_data: List[Dict]) -> Dict:
         """Analyze event performance metrics"""
+        if POLARS_AVAILABLE:
+            return self._analyze_event_performance_polars(events_data)
+        
         df = pd.DataFrame(events_data)
         
         insights = {
@@ -25,18 +71,22 @@ class InsightsEngine:
             "risk_alerts": []
         }
         
-        # Calculate key metrics
-        df['profit_margin'] = (df['revenue'] - df['cost']) / df['revenue'] * 100
-        df['occupancy_rate'] = df['attendees'] / df['capacity'] * 100
-        df['roi'] = (df['revenue'] - df['cost']) / df['cost'] * 100
+        # Calculate key metrics in one pass over the raw column arrays
+        revenue = df['revenue'].to_numpy(dtype=float)
+        cost = df['cost'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gross = revenue - cost
+            df['profit_margin'] = gross / revenue * 100
+            df['occupancy_rate'] = df['attendees'].to_numpy(dtype=float) / df['capacity'].to_numpy(dtype=float) * 100
+            df['roi'] = gross / cost * 100
         
         # Identify top performers
-        top_events = df.nlargest(5, 'roi')
+        top_events = df.iloc[_top_k_indices(df['roi'].to_numpy(), 5)]
         insights["top_performing_events"] = top_events[['event_name', 'roi', 'profit_margin', 'attendees']].to_dict('records')
         
         # Analyze trends
         if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
+            df['date'] = _parse_dates(df['date'])
             df.set_index('date', inplace=True)
             
             # Monthly trends
@@ -54,10 +104,133 @@ class InsightsEngine:
         
         return insights
     
-    def _calculate_growth_rate(self, series: pd.Series) -> float:
+    def _analyze_event_performance_polars(self, events_data: List[Dict]) -> Dict:
+        """
+        Polars version of analyze_event_performance with the same output. NaN
+        ratios (0/0) are skipped by the aggregations, as pandas does.
+        """
+        df = pl.from_dicts(events_data, infer_schema_length=None)
+        
+        insights = {
+            "top_performing_events": [],
+            "trends": {},
+            "recommendations": [],
+            "risk_alerts": []
+        }
+        
+        # Calculate key metrics
+        revenue = pl.col('revenue').cast(pl.Float64)
+        cost = pl.col('cost').cast(pl.Float64)
+        df = df.with_columns(
+            ((revenue - cost) / revenue * 100).alias('profit_margin'),
+            (pl.col('attendees').cast(pl.Float64) / pl.col('capacity').cast(pl.Float64) * 100).alias('occupancy_rate'),
+            ((revenue - cost) / cost * 100).alias('roi')
+        )
+        
+        # Identify top performers (stable sort keeps the first of tied events, as nlargest
+        # does); events without an ROI sort last and only fill places left over
+        top_events = (df.sort(pl.col('roi').fill_nan(None), descending=True, nulls_last=True, maintain_order=True)
+                      .head(5))
+        # Null ratios come back as NaN, as in the pandas frame
+        insights["top_performing_events"] = top_events.select(
+            'event_name', pl.col('roi', 'profit_margin').fill_null(np.nan), 'attendees'
+        ).to_dicts()
+        
+        # Analyze trends
+        if 'date' in df.columns:
+            date = pl.col('date')
+            df = df.with_columns(_parse_dates_polars(df['date']))
+            
+            # Monthly trends
+            monthly_revenue = (df.filter(date.is_not_null())
+                               .sort('date')
+                               .group_by_dynamic('date', every='1mo')
+                               .agg(pl.col('revenue').sum()))
+            insights["trends"]["monthly_revenue_growth"] = self._calculate_growth_rate(monthly_revenue['revenue'])
+            
+            # Seasonal patterns
+            seasonality = {}
+            if 'month' in df.columns:
+                monthly_avg = self._group_means_polars(df, 'month', 'revenue')
+                peak = monthly_avg.row(monthly_avg['revenue'].arg_max(), named=True)
+                seasonality["peak_month"] = peak['month']
+                seasonality["peak_revenue"] = peak['revenue']
+            
+            if 'day_of_week' in df.columns:
+                weekday_avg = self._group_means_polars(df, 'day_of_week', 'attendees')
+                seasonality["best_day"] = weekday_avg['day_of_week'][weekday_avg['attendees'].arg_max()]
+            
+            insights["trends"]["seasonality"] = seasonality
+        
+        # Generate recommendations
+        recommendations = []
+        
+        stats = df.select(
+            pl.col('ticket_price').fill_nan(None).mean().alias('avg_price'),
+            pl.corr('ticket_price', 'attendees').alias('price_demand_corr'),
+            pl.col('occupancy_rate').fill_nan(None).mean().alias('avg_occupancy'),
+            (pl.col('roi') < 0).sum().alias('negative_roi'),
+            (pl.col('attendees') > pl.col('capacity')).sum().alias('overbooked'),
+            *([(pl.col('rating') < 3).sum().alias('low_rated')] if 'rating' in df.columns else [])
+        ).row(0, named=True)
+        # Means and correlations of all-null columns come back as None; as NaN
+        # they fail every comparison below, as the pandas path's NaN does
+        stats = {name: np.nan if value is None else value for name, value in stats.items()}
+        
+        # Pricing recommendations
+        avg_price = stats['avg_price']
+        if len(df) < 10:
+            optimal_price = avg_price * 1.1
+        elif stats['price_demand_corr'] > -0.3:  # Inelastic demand
+            optimal_price = avg_price * 1.15
+        else:  # Elastic demand
+            optimal_price = avg_price * 1.05
+        
+        if avg_price < optimal_price * 0.8:
+            recommendations.append(f"Consider increasing average ticket price from ${avg_price:.2f} to ${optimal_price:.2f}")
+        
+        # Capacity optimization
+        avg_occupancy = stats['avg_occupancy']
+        if avg_occupancy > 85:
+            recommendations.append("High occupancy rates detected. Consider increasing venue capacity or adding more events.")
+        elif avg_occupancy < 50:
+            recommendations.append("Low occupancy rates. Review marketing strategy and consider price adjustments.")
+        
+        # Event type optimization
+        if 'event_type' in df.columns:
+            event_type_performance = self._group_means_polars(df, 'event_type', 'roi')
+            best = event_type_performance.row(event_type_performance['roi'].arg_max(), named=True)
+            worst = event_type_performance.row(event_type_performance['roi'].arg_min(), named=True)
+            
+            recommendations.append(f"Focus on organizing more '{best['event_type']}' events (ROI: {best['roi']:.1f}%)")
+            recommendations.append(f"Review strategy for '{worst['event_type']}' events or consider discontinuation")
+        
+        insights["recommendations"] = recommendations
+        
+        # Risk alerts
+        risks = []
+        if stats['negative_roi'] > 0:
+            risks.append(f"{stats['negative_roi']} events with negative ROI detected")
+        if stats['overbooked'] > 0:
+            risks.append(f"{stats['overbooked']} events overbooked. Review capacity planning.")
+        if stats.get('low_rated', 0) > 0:
+            risks.append(f"{stats['low_rated']} events with low ratings (<3). Quality improvement needed.")
+        insights["risk_alerts"] = risks
+        
+        return insights
+    
+    def _group_means_polars(self, df, key: str, value: str):
+        """Mean of ``value`` per non-null ``key``, sorted by key like a pandas groupby"""
+        return (df.filter(pl.col(key).is_not_null())
+                .group_by(key)
+                .agg(pl.col(value).fill_nan(None).mean())
+                .sort(key))
+    
+    def _calculate_growth_rate(self, series) -> float:
         """Calculate growth rate"""
         if len(series) > 1:
-            return ((series.iloc[-1] - series.iloc[0]) / series.iloc[0]) * 100
+            values = series.to_numpy()
+            return ((values[-1] - values[0]) / values[0]) * 100
         return 0
     
     def _detect_seasonality(self, df: pd.DataFrame) -> Dict:
@@ -65,18 +238,38 @@ class InsightsEngine:
         seasonality = {}
         
         if 'month' in df.columns:
-            monthly_avg = df.groupby('month')['revenue'].mean()
+            monthly_avg = self._group_means(df, 'month', 'revenue', 12)
             peak_month = monthly_avg.idxmax()
             seasonality["peak_month"] = peak_month
             seasonality["peak_revenue"] = monthly_avg.max()
             
         if 'day_of_week' in df.columns:
-            weekday_avg = df.groupby('day_of_week')['attendees'].mean()
+            weekday_avg = self._group_means(df, 'day_of_week', 'attendees', 6)
             best_day = weekday_avg.idxmax()
             seasonality["best_day"] = best_day
         
         return seasonality
     
+    def _group_means(self, df: pd.DataFrame, key: str, value: str, max_key: int) -> pd.Series:
+        """
+        Mean of ``value`` per ``key``, as ``df.groupby(key)[value].mean()``. Integer
+        keys within 0..max_key (months, weekdays) are reduced with np.bincount,
+        skipping the groupby hash table; any other key falls back to groupby.
+        """
+        keys = df[key]
+        if keys.dtype.kind not in 'iu' or keys.empty or keys.min() < 0 or keys.max() > max_key:
+            return df.groupby(key)[value].mean()
+        
+        codes = keys.to_numpy()
+        values = df[value].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=max_key + 1)
+        counts = np.bincount(codes[valid], minlength=max_key + 1)
+        present = np.bincount(codes, minlength=max_key + 1) > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums / counts
+        return pd.Series(means[present], index=pd.Index(np.flatnonzero(present), dtype=keys.dtype, name=key), name=value)
+    
     def _generate_recommendations(self, df: pd.DataFrame) -> List[str]:
         """Generate business recommendations"""
         recommendations = []
@@ -108,36 +301,46 @@ class InsightsEngine:
     
     def _calculate_optimal_price(self, df: pd.DataFrame) -> float:
         """Calculate optimal ticket price using elasticity analysis"""
+        avg_price = df['ticket_price'].mean()
         if len(df) < 10:
-            return df['ticket_price'].mean() * 1.1
+            return avg_price * 1.1
         
-        # Simple elasticity model
-        price_demand_corr = df['ticket_price'].corr(df['attendees'])
+        # Simple elasticity model: Pearson correlation over the events with both
+        # values set, as Series.corr computes it (NaN when undefined)
+        price = df['ticket_price'].to_numpy(dtype=float)
+        attendees = df['attendees'].to_numpy(dtype=float)
+        paired = ~(np.isnan(price) | np.isnan(attendees))
+        price_demand_corr = np.nan
+        if paired.sum() > 1:
+            price_dev = price[paired] - price[paired].mean()
+            attendees_dev = attendees[paired] - attendees[paired].mean()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                price_demand_corr = (price_dev @ attendees_dev) / np.sqrt((price_dev @ price_dev) * (attendees_dev @ attendees_dev))
         
         if price_demand_corr > -0.3:  # Inelastic demand
-            return df['ticket_price'].mean() * 1.15
+            return avg_price * 1.15
         else:  # Elastic demand
-            return df['ticket_price'].mean() * 1.05
+            return avg_price * 1.05
     
     def _identify_risks(self, df: pd.DataFrame) -> List[str]:
         """Identify potential risks"""
         risks = []
         
         # Financial risks
-        negative_roi = df[df['roi'] < 0]
-        if len(negative_roi) > 0:
-            risks.append(f"{len(negative_roi)} events with negative ROI detected")
+        negative_roi = int((df['roi'].to_numpy() < 0).sum())
+        if negative_roi > 0:
+            risks.append(f"{negative_roi} events with negative ROI detected")
         
         # Capacity risks
-        overbooked = df[df['attendees'] > df['capacity']]
-        if len(overbooked) > 0:
-            risks.append(f"{len(overbooked)} events overbooked. Review capacity planning.")
+        overbooked = int((df['attendees'].to_numpy(dtype=float) > df['capacity'].to_numpy(dtype=float)).sum())
+        if overbooked > 0:
+            risks.append(f"{overbooked} events overbooked. Review capacity planning.")
         
         # Customer satisfaction risks
         if 'rating' in df.columns:
-            low_rated = df[df['rating'] < 3]
-            if len(low_rated) > 0:
-                risks.append(f"{len(low_rated)} events with low ratings (<3). Quality improvement needed.")
+            low_rated = int((df['rating'].to_numpy(dtype=float) < 3).sum())
+            if low_rated > 0:
+                risks.append(f"{low_rated} events with low ratings (<3). Quality improvement needed.")
         
         return risks
     
@@ -149,28 +352,30 @@ class InsightsEngine:
             return {"error": "Insufficient data for prediction"}
         
         # Prepare data for time series prediction
-        df['date'] = pd.to_datetime(df['date'])
+        df['date'] = _parse_dates(df['date'])
         df = df.sort_values('date')
-        df['time_index'] = range(len(df))
         
-        # Simple linear regression for revenue prediction
-        X = df[['time_index']].values
-        y = df['revenue'].values
+        # Simple linear regression of revenue on the time index, in closed form.
+        # Nothing is fitted in place, so concurrent calls share no state
+        n = len(df)
+        x = np.arange(n, dtype=np.float64)
+        y = df['revenue'].to_numpy(dtype=np.float64)
         
-        self.regression_model.fit(X, y)
+        x_mean, y_mean = x.mean(), y.mean()
+        slope = ((x - x_mean) * (y - y_mean)).sum() / ((x - x_mean) ** 2).sum()
+        intercept = y_mean - slope * x_mean
         
         # Predict next periods
-        future_indices = np.array(range(len(df), len(df) + periods)).reshape(-1, 1)
-        predictions = self.regression_model.predict(future_indices)
+        predictions = intercept + slope * np.arange(n, n + periods, dtype=np.float64)
         
         # Generate confidence intervals
-        residuals = y - self.regression_model.predict(X)
+        residuals = y - (intercept + slope * x)
         std_error = np.std(residuals)
         confidence_interval = 1.96 * std_error  # 95% confidence
         
         return {
             "predictions": predictions.tolist(),
             "confidence_interval": confidence_interval,
-            "growth_rate": self.regression_model.coef_[0],
+            "growth_rate": slope,
             "next_period_forecast": predictions[0] if len(predictions) > 0 else 0
         }
\ No newline at end of file
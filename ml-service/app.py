@@ -2,45 +2,132 @@
 Main Flask application for Python ML services
 Integrates with Node.js AI agents
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import json
+import multiprocessing
 import sys
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import modules
-from analytics.generate_reports import generate_event_analytics_report
-from analytics.chart_generator import ChartGenerator
-from analytics.insights_engine import InsightsEngine
-from fraud.predict import FraudPredictor
-from fraud.train import FraudModelTrainer
+# Import modules. Process-pool workers are spawned and import this module again
+# (as __mp_main__ under `python app.py`), but only need the feature extractor,
+# so the analytics, fraud model and sentiment stacks are imported by the
+# component getters below instead of here
 from fraud.feature_extractor import FraudFeatureExtractor
-from fraud.anomaly_detector import AnomalyDetector
-from sentiment.sentiment_model import SentimentAnalyzer
-from sentiment.emotion_detector import EmotionDetector
-from sentiment.aspect_based_sentiment import AspectSentimentAnalyzer
+
+if TYPE_CHECKING:
+    from analytics.chart_generator import ChartGenerator
+    from analytics.insights_engine import InsightsEngine
+    from fraud.predict import FraudPredictor
+    from sentiment.sentiment_model import SentimentAnalyzer
+    from sentiment.emotion_detector import EmotionDetector
+    from sentiment.aspect_based_sentiment import AspectSentimentAnalyzer
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
 # Initialize components
-chart_generator = ChartGenerator()
-insights_engine = InsightsEngine()
-fraud_predictor = FraudPredictor()
 feature_extractor = FraudFeatureExtractor()
-sentiment_analyzer = SentimentAnalyzer()
-emotion_detector = EmotionDetector()
-aspect_analyzer = AspectSentimentAnalyzer()
 
-# Load models (in production, use lazy loading)
-try:
-    fraud_predictor.load_model()
-    print("Fraud detection model loaded successfully")
-except Exception as e:
-    print(f"Error loading fraud model: {e}")
+# Components with a costly start-up (imports, model weights, matplotlib) are
+# created on first use, so a process only pays for the endpoints it actually
+# serves, and pool workers pay for none of them
+_lazy_components = {}
+_lazy_components_lock = threading.Lock()
+
+def _lazy_component(name: str, factory):
+    component = _lazy_components.get(name)
+    if component is None:
+        with _lazy_components_lock:
+            component = _lazy_components.get(name)
+            if component is None:
+                component = _lazy_components[name] = factory()
+    return component
+
+def _load_fraud_predictor() -> 'FraudPredictor':
+    from fraud.predict import FraudPredictor
+    predictor = FraudPredictor()
+    try:
+        predictor.load_model()
+        print("Fraud detection model loaded successfully")
+    except Exception as e:
+        print(f"Error loading fraud model: {e}")
+    return predictor
+
+def get_fraud_predictor() -> 'FraudPredictor':
+    return _lazy_component('fraud_predictor', _load_fraud_predictor)
+
+def get_insights_engine() -> 'InsightsEngine':
+    from analytics.insights_engine import InsightsEngine
+    return _lazy_component('insights_engine', InsightsEngine)
+
+def get_chart_generator() -> 'ChartGenerator':
+    from analytics.chart_generator import ChartGenerator
+    return _lazy_component('chart_generator', ChartGenerator)
+
+def get_sentiment_analyzer() -> 'SentimentAnalyzer':
+    from sentiment.sentiment_model import SentimentAnalyzer
+    return _lazy_component('sentiment_analyzer', SentimentAnalyzer)
+
+def get_emotion_detector() -> 'EmotionDetector':
+    from sentiment.emotion_detector import EmotionDetector
+    return _lazy_component('emotion_detector', EmotionDetector)
+
+def get_aspect_analyzer() -> 'AspectSentimentAnalyzer':
+    from sentiment.aspect_based_sentiment import AspectSentimentAnalyzer
+    return _lazy_component('aspect_analyzer', AspectSentimentAnalyzer)
+
+# Fraud feature extraction is pure Python and holds the GIL, so large batches
+# are split into chunks for a process pool shared by all requests; smaller
+# batches stay on the request thread, where they finish before the transfer
+# to worker processes would pay off
+PARALLEL_MIN_BATCH = 1024
+PARALLEL_CHUNK_SIZE = 64
+
+# Training feature preparation is column-wise and much cheaper per row, so only
+# large retraining sets are split by user across the same pool
+PARALLEL_MIN_TRAINING_ROWS = 100_000
+
+def get_executor() -> ProcessPoolExecutor:
+    # Workers are spawned rather than forked: by the time the pool starts, this
+    # process runs Flask request threads and possibly numba/BLAS/onnxruntime
+    # thread pools, whose locks a forked child could inherit held
+    return _lazy_component('executor', lambda: ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn')))
+
+def _json_response(payload: dict):
+    """
+    JSON response for the large batch endpoints: orjson serializes the result
+    tree in one native pass (NumPy values included); jsonify is the fallback
+    """
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
+        return Response(body, mimetype='application/json')
+    return jsonify(payload)
+
+def _distribution(results: list, key: str, low: float, high: float) -> dict:
+    """
+    high/medium/low counts of results[key] in one vectorized pass; medium is
+    the closed interval [low, high], as the endpoints have always reported it
+    """
+    values = np.fromiter((r[key] for r in results), dtype=np.float64, count=len(results))
+    buckets = (values >= low).astype(np.intp) + (values > high)
+    low_count, medium_count, high_count = np.bincount(buckets, minlength=3).tolist()
+    return {'high': high_count, 'medium': medium_count, 'low': low_count}
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -49,16 +136,36 @@ def health_check():
         'status': 'healthy',
         'services': {
             'analytics': 'available',
-            'fraud_detection': 'available' if fraud_predictor.model_loaded else 'unavailable',
+            'fraud_detection': 'available' if get_fraud_predictor().model_loaded else 'unavailable',
             'sentiment_analysis': 'available',
             'emotion_detection': 'available',
             'aspect_analysis': 'available'
         }
     })
 
+@app.route('/warmup', methods=['POST'])
+def warmup():
+    """Create the lazily loaded components ahead of the first request"""
+    try:
+        for getter in (get_fraud_predictor, get_insights_engine, get_chart_generator,
+                       get_sentiment_analyzer, get_emotion_detector, get_aspect_analyzer):
+            getter()
+        
+        return jsonify({
+            'success': True,
+            'loaded': sorted(_lazy_components)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/analytics/generate-report', methods=['POST'])
 def generate_report():
     """Generate analytics report"""
+    from analytics.generate_reports import generate_event_analytics_report
     try:
         data = request.json
         event_data = data.get('event_data', [])
@@ -69,6 +176,7 @@ def generate_report():
         
         # Generate charts
         charts = {}
+        chart_generator = get_chart_generator()
         if event_data:
             charts['booking_trends'] = chart_generator.generate_booking_trends_chart(event_data)
             
@@ -81,6 +189,7 @@ def generate_report():
             charts['user_engagement'] = chart_generator.generate_user_engagement_chart(engagement_data)
         
         # Generate insights
+        insights_engine = get_insights_engine()
         insights = insights_engine.analyze_event_performance(event_data)
         
         # Future predictions
@@ -108,56 +217,47 @@ def detect_fraud():
         data = request.json
         transactions = data.get('transactions', [])
         
+        # Extract features per transaction and stage them as one frame for the model
+        executor = get_executor() if len(transactions) >= PARALLEL_MIN_BATCH else None
+        features_list = feature_extractor.extract_features_batch(
+            transactions, data.get('user_history', {}), executor=executor, chunk_size=PARALLEL_CHUNK_SIZE)
+        feature_df = feature_extractor.features_to_frame(features_list)
+        fraud_predictor = get_fraud_predictor()
+        predictions = fraud_predictor.predict_many(features_list, feature_df)
+        
         results = []
         
-        for transaction in transactions:
-            # Extract features
-            user_history = data.get('user_history', {}).get(transaction.get('user_id'), [])
-            features = feature_extractor.extract_features(transaction, user_history)
-            
-            # Predict fraud
-            prediction = fraud_predictor.predict(features)
-            
-            # Get confidence and explanation
-            confidence = fraud_predictor.predict_proba(features)
-            explanation = fraud_predictor.explain_prediction(features)
-            
+        for transaction, features, (is_fraud, probability, explanation) in zip(transactions, features_list, predictions):
             result = {
                 'transaction_id': transaction.get('id'),
                 'user_id': transaction.get('user_id'),
                 'amount': transaction.get('amount'),
-                'is_fraud': bool(prediction),
-                'fraud_probability': float(confidence[1]) if len(confidence) > 1 else 0.0,
+                'is_fraud': bool(is_fraud),
+                'fraud_probability': float(probability),
                 'risk_score': features.get('composite_risk_score', 0),
                 'explanation': explanation,
-                'recommended_action': 'BLOCK' if prediction else 'ALLOW',
+                'recommended_action': 'BLOCK' if is_fraud else 'ALLOW',
                 'features': {k: float(v) for k, v in features.items() if isinstance(v, (int, float))}
             }
             
             results.append(result)
         
-        # Batch anomaly detection
-        if transactions and fraud_predictor.model_loaded:
-            feature_matrix = feature_extractor.prepare_training_data(transactions)
-            anomalies, scores = fraud_predictor.detect_anomalies(feature_matrix)
-            
-            for i, result in enumerate(results):
-                if i < len(anomalies):
-                    result['is_anomaly'] = bool(anomalies[i])
-                    result['anomaly_score'] = float(scores[i])
+        # Batch anomaly detection on the features already staged for the model
+        anomaly_detection = fraud_predictor.detect_anomalies(feature_df) if transactions and fraud_predictor.model_loaded else None
+        if anomaly_detection is not None:
+            anomalies, scores = anomaly_detection
+            for result, is_anomaly, score in zip(results, anomalies, scores):
+                result['is_anomaly'] = bool(is_anomaly)
+                result['anomaly_score'] = float(score)
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'results': results,
             'summary': {
                 'total_transactions': len(results),
                 'fraudulent_count': sum(1 for r in results if r['is_fraud']),
                 'anomaly_count': sum(1 for r in results if r.get('is_anomaly', False)),
-                'risk_distribution': {
-                    'high': sum(1 for r in results if r['risk_score'] > 70),
-                    'medium': sum(1 for r in results if 30 <= r['risk_score'] <= 70),
-                    'low': sum(1 for r in results if r['risk_score'] < 30)
-                }
+                'risk_distribution': _distribution(results, 'risk_score', 30, 70)
             }
         })
         
@@ -176,6 +276,10 @@ def analyze_sentiment():
         analysis_type = data.get('analysis_type', 'basic')  # basic, emotion, aspect
         
         results = []
+        confidences = []
+        sentiment_analyzer = get_sentiment_analyzer()
+        emotion_detector = get_emotion_detector() if analysis_type in ['emotion', 'aspect'] else None
+        aspect_analyzer = get_aspect_analyzer() if analysis_type == 'aspect' else None
         
         for feedback in feedback_list:
             text = feedback.get('text', '')
@@ -214,12 +318,14 @@ def analyze_sentiment():
             }
             
             results.append(result)
+            confidences.append(analysis_result.get('sentiment', {}).get('confidence', 0))
         
-        # Sort by priority and negative sentiment
-        results.sort(key=lambda x: (
-            x['requires_attention'],
-            -x.get('analysis', {}).get('sentiment', {}).get('confidence', 0)
-        ), reverse=True)
+        # Sort by priority and negative sentiment: flagged feedback first, then
+        # by ascending confidence; the sort keys were gathered in the loop above
+        # and lexsort is stable, so ties keep their input order
+        attention = np.fromiter((r['requires_attention'] for r in results), dtype=bool, count=len(results))
+        order = np.lexsort((np.asarray(confidences, dtype=np.float64), ~attention))
+        results = [results[i] for i in order]
         
         # Generate summary
         if results:
@@ -231,12 +337,12 @@ def analyze_sentiment():
                 'negative_feedback': negative_count,
                 'positive_feedback': positive_count,
                 'negative_percentage': (negative_count / len(results)) * 100 if results else 0,
-                'top_issues': self._extract_top_issues(results) if analysis_type == 'aspect' else []
+                'top_issues': _extract_top_issues(results) if analysis_type == 'aspect' else []
             }
         else:
             summary = {}
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'results': results,
             'summary': summary,
@@ -256,18 +362,14 @@ def batch_analyze_sentiment():
         data = request.json
         feedback_list = data.get('feedback', [])
         
-        results = emotion_detector.analyze_feedback_batch(feedback_list)
+        results = get_emotion_detector().analyze_feedback_batch(feedback_list)
         
         return jsonify({
             'success': True,
             'results': results,
             'total_analyzed': len(results),
             'requires_attention': sum(1 for r in results if r['requires_attention']),
-            'priority_distribution': {
-                'high': sum(1 for r in results if r['priority'] > 0.7),
-                'medium': sum(1 for r in results if 0.3 <= r['priority'] <= 0.7),
-                'low': sum(1 for r in results if r['priority'] < 0.3)
-            }
+            'priority_distribution': _distribution(results, 'priority', 0.3, 0.7)
         })
         
     except Exception as e:
@@ -294,10 +396,11 @@ def train_model():
                 }), 400
             
             # Prepare features
-            feature_extractor = FraudFeatureExtractor()
-            X = feature_extractor.prepare_training_data(training_data, labels)
+            executor = get_executor() if len(training_data) >= PARALLEL_MIN_TRAINING_ROWS else None
+            X = feature_extractor.prepare_training_data(training_data, labels, executor=executor)
             
             # Train model
+            fraud_predictor = get_fraud_predictor()
             success = fraud_predictor.train(X, labels)
             
             if success:
@@ -324,18 +427,14 @@ def train_model():
             'error': str(e)
         }), 500
 
-def _extract_top_issues(self, results: List[Dict]) -> List[str]:
-    """Extract top issues from aspect analysis results"""
-    issues = []
+def _extract_top_issues(results: List[Dict]) -> List[Dict]:
+    """Extract the five most frequent improvement areas from aspect analysis results"""
+    issue_counts = Counter()
     
     for result in results:
-        if result.get('analysis', {}).get('aspect', {}).get('has_aspects', False):
-            aspects = result['analysis']['aspect']['aspect_summary']['improvement_areas']
-            issues.extend(aspects)
-    
-    # Count frequencies
-    from collections import Counter
-    issue_counts = Counter(issues)
+        aspect = result.get('analysis', {}).get('aspect', {})
+        if aspect.get('has_aspects', False):
+            issue_counts.update(aspect['aspect_summary']['improvement_areas'])
     
     return [{'issue': issue, 'count': count} for issue, count in issue_counts.most_common(5)]
 
@@ -347,10 +446,14 @@ if __name__ == '__main__':
     print(f"Starting Python ML Service on port {port}")
     print("Available endpoints:")
     print("  GET  /health")
+    print("  POST /warmup")
     print("  POST /api/analytics/generate-report")
     print("  POST /api/fraud/detect")
     print("  POST /api/sentiment/analyze")
     print("  POST /api/sentiment/batch-analyze")
     print("  POST /api/models/train")
     
+    # Load the fraud model before serving, as the service always has
+    get_fraud_predictor()
+    
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Numeric kernels for the fraud detection modules
+Scans scaled feature matrices for the values behind an anomaly explanation,
+reduces a user's transaction history to its behavior statistics, and
+evaluates the rule-based fraud checks
+"""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _deviation_kernel(features_scaled, scores, threshold, limit):
+        # First pass sizes the output, second pass fills it in row-major order
+        n_rows, n_cols = features_scaled.shape
+        count = 0
+        for i in range(n_rows):
+            if scores[i] < threshold:
+                for j in range(n_cols):
+                    if abs(features_scaled[i, j]) > limit:
+                        count += 1
+        
+        rows = np.empty(count, np.int64)
+        cols = np.empty(count, np.int64)
+        k = 0
+        for i in range(n_rows):
+            if scores[i] < threshold:
+                for j in range(n_cols):
+                    if abs(features_scaled[i, j]) > limit:
+                        rows[k] = i
+                        cols[k] = j
+                        k += 1
+        return rows, cols
+
+    @njit(cache=True)
+    def _history_kernel(amount, timestamps, failed):
+        # Pass 1: amount sum, failures and timestamp gaps
+        n = amount.shape[0]
+        amount_sum = 0.0
+        amount_count = 0
+        failures = 0
+        gap_sum = 0.0
+        gap_count = 0
+        for i in range(n):
+            if not np.isnan(amount[i]):
+                amount_sum += amount[i]
+                amount_count += 1
+            if failed[i]:
+                failures += 1
+            t = timestamps[i]
+            if i > 0 and not np.isnan(t) and not np.isnan(timestamps[i - 1]):
+                gap_sum += (np.int64(t) - np.int64(timestamps[i - 1])) / 1e9
+                gap_count += 1
+        
+        mean = amount_sum / amount_count if amount_count > 0 else np.nan
+        
+        # Pass 2: squared deviations from the mean, for a numerically stable std
+        std = np.nan
+        if amount_count > 1:
+            sq = 0.0
+            for i in range(n):
+                if not np.isnan(amount[i]):
+                    sq += (amount[i] - mean) ** 2
+            std = np.sqrt(sq / (amount_count - 1))
+        
+        mean_gap = gap_sum / gap_count if gap_count > 0 else np.nan
+        failure_rate = failures / n if n > 0 else np.nan
+        return mean, std, mean_gap, failure_rate
+    
+    @njit(cache=True)
+    def _prior_window_kernel(users, timestamps, thresholds, n_users):
+        # Each row links to the previous row of its user; the walk back over a
+        # user's earlier rows stops at the first one at or before the threshold
+        # while that user's timestamps have been non-decreasing so far
+        n = users.shape[0]
+        last = np.full(n_users, -1, np.int64)
+        latest = np.full(n_users, -np.inf)
+        ordered = np.ones(n_users, np.bool_)
+        previous = np.empty(n, np.int64)
+        counts = np.zeros(n, np.int64)
+        for i in range(n):
+            u = users[i]
+            j = last[u]
+            while j >= 0:
+                t = timestamps[j]
+                if t > thresholds[i]:
+                    counts[i] += 1
+                elif ordered[u] and not np.isnan(t):
+                    break
+                j = previous[j]
+            
+            previous[i] = last[u]
+            last[u] = i
+            t = timestamps[i]
+            if not np.isnan(t):
+                if t < latest[u]:
+                    ordered[u] = False
+                else:
+                    latest[u] = t
+        return counts
+
+    @njit(cache=True)
+    def _rule_mask_kernel(values):
+        # Columns: amount deviation, hourly velocity, night hours, short
+        # session, first transaction, amount, failure rate
+        masks = np.zeros(values.shape[0], np.uint16)
+        for i in range(values.shape[0]):
+            deviation, velocity, night, short, first, amount, failure = values[i]
+            mask = 0
+            if deviation > 5:
+                mask |= 1
+            elif deviation > 3:
+                mask |= 2
+            if velocity > 10:
+                mask |= 4
+            elif velocity > 5:
+                mask |= 8
+            if night == 1:
+                mask |= 16
+            if short == 1:
+                mask |= 32
+            if first != 0 and amount > 100:
+                mask |= 64
+            if failure > 0.5:
+                mask |= 128
+            masks[i] = mask
+        return masks
+
+def history_statistics(amount: np.ndarray, timestamps: np.ndarray,
+                       failed: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    NaN-skipping mean and sample std of amount, mean gap between consecutive
+    timestamps and failure rate, computed in one scan
+    
+    Timestamps are taken as pandas reads a numeric epoch column: truncated to
+    integer nanoseconds, so gaps are in seconds of that reading. Gaps next to a
+    missing (NaN) timestamp are skipped.
+    
+    Args:
+        amount: Transaction amounts (NaN where missing)
+        timestamps: Transaction timestamps (NaN where missing)
+        failed: Whether each transaction failed
+    
+    Returns:
+        (mean, std, mean_gap, failure_rate); NaN for statistics without enough values
+    """
+    amount = np.ascontiguousarray(amount, dtype=np.float64)
+    timestamps = np.ascontiguousarray(timestamps, dtype=np.float64)
+    failed = np.ascontiguousarray(failed, dtype=np.bool_)
+    
+    if NUMBA_AVAILABLE:
+        return _history_kernel(amount, timestamps, failed)
+    
+    valid = amount[~np.isnan(amount)]
+    mean = valid.mean() if valid.size else np.nan
+    std = np.sqrt(((valid - mean) ** 2).sum() / (valid.size - 1)) if valid.size > 1 else np.nan
+    
+    timed = ~np.isnan(timestamps)
+    ns = np.where(timed, timestamps, 0).astype(np.int64)
+    paired = timed[1:] & timed[:-1]
+    gaps = (ns[1:] - ns[:-1])[paired] / 1e9
+    mean_gap = gaps.mean() if gaps.size else np.nan
+    
+    failure_rate = failed.mean() if failed.size else np.nan
+    return mean, std, mean_gap, failure_rate
+
+def prior_window_counts(users: np.ndarray, timestamps: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """
+    For each row, the number of earlier rows of the same user whose timestamp
+    is after the row's threshold (e.g. its own reference time minus a window)
+    
+    Args:
+        users: User code per row, 0..n_users-1
+        timestamps: Timestamp per row (NaN where missing; never counted)
+        thresholds: Per-row lower bound, exclusive
+    
+    Returns:
+        Count per row
+    """
+    users = np.ascontiguousarray(users, dtype=np.int64)
+    timestamps = np.ascontiguousarray(timestamps, dtype=np.float64)
+    thresholds = np.ascontiguousarray(thresholds, dtype=np.float64)
+    n_users = int(users.max()) + 1 if users.size else 0
+    
+    if NUMBA_AVAILABLE:
+        return _prior_window_kernel(users, timestamps, thresholds, n_users)
+    
+    # Per user, each row against the earlier rows' timestamps
+    counts = np.zeros(users.shape[0], np.int64)
+    order = np.argsort(users, kind='stable')
+    starts = np.flatnonzero(np.diff(users[order], prepend=-1))
+    for rows in np.split(order, starts[1:]):
+        user_timestamps = timestamps[rows]
+        for k in range(1, rows.size):
+            counts[rows[k]] = np.count_nonzero(user_timestamps[:k] > thresholds[rows[k]])
+    return counts
+
+def deviating_features(features_scaled: np.ndarray, scores: np.ndarray,
+                       threshold: float, limit: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions of the scaled feature values beyond +/-limit in the rows whose
+    anomaly score is below threshold
+    
+    Args:
+        features_scaled: Standardized feature matrix (rows x features)
+        scores: Anomaly score per row (lower = more anomalous)
+        threshold: Rows scoring below this are anomalous
+        limit: Absolute scaled value a feature must exceed
+    
+    Returns:
+        (rows, cols) index arrays in row-major order
+    """
+    # float32 and float64 inputs are both scanned as-is (numba compiles one kernel per dtype)
+    features_scaled = np.ascontiguousarray(features_scaled)
+    if features_scaled.dtype not in (np.float32, np.float64):
+        features_scaled = features_scaled.astype(np.float64)
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    
+    if NUMBA_AVAILABLE:
+        return _deviation_kernel(features_scaled, scores, float(threshold), float(limit))
+    
+    mask = (np.abs(features_scaled) > limit) & (scores < threshold)[:, None]
+    return np.nonzero(mask)
+
+def rule_masks(values: np.ndarray) -> np.ndarray:
+    """
+    Bitmask of the fraud rules each row triggers, for FraudPredictor's
+    rule-based detection
+    
+    Args:
+        values: (rows x 7) amount deviation ratio, hourly velocity, night hours
+            flag, short session flag, first transaction (0/1), amount and
+            previous failure rate
+    
+    Returns:
+        uint16 mask per row; bits in rule order: extreme/high amount deviation,
+        extreme/high velocity, night, short session, new user high amount,
+        failure history
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64).reshape(-1, 7)
+    
+    if NUMBA_AVAILABLE:
+        return _rule_mask_kernel(values)
+    
+    deviation, velocity, night, short, first, amount, failure = values.T
+    bits = [deviation > 5, (deviation > 3) & ~(deviation > 5),
+            velocity > 10, (velocity > 5) & ~(velocity > 10),
+            night == 1, short == 1, (first != 0) & (amount > 100), failure > 0.5]
+    return sum(bit.astype(np.uint16) << i for i, bit in enumerate(bits)).astype(np.uint16)
@@ -5,39 +5,183 @@ Extracts relevant features from booking and user data
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple, Union
+import bisect
 import hashlib
+import math
+import os
+import time
+from functools import lru_cache
+from fraud._kernels import history_statistics, prior_window_counts
+
+# DuckDB is optional: when installed, large training sets compute the per-user
+# history statistics with its window functions; otherwise pandas is used
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# pyarrow is optional: prepare_training_data can return an Arrow table for
+# consumers that take Arrow buffers directly (DuckDB, polars, GPU loaders)
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Low-cardinality string features, stored as pandas categoricals in training
+# frames (integer codes plus one copy of each label instead of a str per cell)
+CATEGORICAL_FEATURES = ('device_type', 'browser', 'os', 'ip_prefix')
+
+# Computed 0/1 flags and small calendar/score integers, stored as int8 in
+# training frames
+INT8_FEATURES = ('payment_method_credit_card', 'payment_method_digital',
+                 'hour_of_day', 'day_of_week', 'day_of_month', 'is_weekend', 'is_night_hours',
+                 'is_business_hours', 'month', 'is_holiday_season', 'short_session',
+                 'high_amount_deviation', 'high_hourly_velocity', 'night_transaction',
+                 'short_session_flag', 'high_failure_history', 'new_user_high_amount',
+                 'composite_risk_score')
+
+# Amounts, ratios, rates and counts (NaN where a row has no history), stored as
+# float32 in training frames
+FLOAT32_FEATURES = ('transaction_amount', 'amount_log', 'session_duration', 'ip_hash',
+                    'avg_transaction_amount', 'std_transaction_amount', 'total_transaction_count',
+                    'amount_deviation_ratio', 'avg_time_between_transactions', 'previous_failure_rate',
+                    'transactions_last_hour', 'transactions_last_24h', 'hourly_velocity', 'daily_velocity')
+
+# Temporal and technical features per distinct transaction context, so replays,
+# retries and backtests of the same transaction reuse one computation
+CONTEXT_CACHE_SIZE = 100_000
+
+# Histories shorter than this (cold-start users) are reduced in plain Python;
+# building arrays for the compiled scan costs more than the arithmetic there
+SMALL_HISTORY_SIZE = 8
+
+# Training sets from this many transactions use DuckDB (when installed) for the
+# per-user history statistics; below it the query setup outweighs the gain
+DUCKDB_MIN_ROWS = 50_000
+
+# (payment_method_credit_card, payment_method_digital) per payment method;
+# any other method is (0, 0)
+PAYMENT_FEATURE_TABLE = {
+    'credit_card': (1, 0),
+    'khalti': (0, 1),
+    'esewa': (0, 1)
+}
+
+# Points each derived risk flag adds to composite_risk_score (capped at 100)
+RISK_WEIGHTS = {
+    'high_amount_deviation': 30,
+    'high_hourly_velocity': 25,
+    'night_transaction': 15,
+    'short_session_flag': 20,
+    'high_failure_history': 25,
+    'new_user_high_amount': 35
+}
+
+@lru_cache(maxsize=65536)
+def _ip_hash(ip_address: str) -> int:
+    """Anonymized IP bucket: the first 32 bits of the address's MD5, mod 10000"""
+    return int.from_bytes(hashlib.md5(ip_address.encode()).digest()[:4], 'big') % 10000
+
+def _local_time(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Epoch seconds as local wall-clock datetime64[s], as datetime.fromtimestamp
+    reads them. UTC offsets only change on quarter-hour boundaries, so one
+    offset lookup per distinct quarter hour covers every row.
+    """
+    quarters, inverse = np.unique(np.floor_divide(timestamps, 900), return_inverse=True)
+    offsets = np.array([time.localtime(quarter * 900).tm_gmtoff for quarter in quarters.tolist()], dtype=np.int64)
+    return (np.floor(timestamps).astype(np.int64) + offsets[inverse.ravel()]).astype('datetime64[s]')
 
 class FraudFeatureExtractor:
     def __init__(self):
         self.user_profiles = {}
         self.device_fingerprints = {}
         
-    def extract_features(self, transaction_data: Dict, user_history: List[Dict] = None) -> Dict:
-        """Extract features for fraud prediction"""
+    def extract_features(self, transaction_data: Dict, user_history: List[Dict] = None,
+                         history_stats: Tuple[Dict, List[float]] = None,
+                         reference_time: float = None) -> Dict:
+        """
+        Extract features for fraud prediction; history_stats optionally passes in
+        the already computed _history_statistics of user_history. Velocity
+        windows end at reference_time, by default the transaction's own
+        timestamp (the current time when it has none).
+        """
+        # Each group of features is written straight into the one result dict
         features = {}
         
         # Transaction features
-        features.update(self._extract_transaction_features(transaction_data))
+        self._extract_transaction_features(transaction_data, features)
         
         # User behavior features
         if user_history:
-            features.update(self._extract_user_behavior_features(transaction_data, user_history))
-        
-        # Temporal features
-        features.update(self._extract_temporal_features(transaction_data))
-        
-        # Device and network features
-        features.update(self._extract_technical_features(transaction_data))
+            self._extract_user_behavior_features(transaction_data, user_history, history_stats, features,
+                                                 reference_time)
+        
+        # Temporal features, then device and network features; both depend only
+        # on the transaction context, so repeated contexts come from the cache
+        context_key = _context_key(transaction_data)
+        if context_key is not None:
+            features.update(_context_features(context_key))
+        else:
+            self._extract_temporal_features(transaction_data, features)
+            self._extract_technical_features(transaction_data, features)
         
         # Derived features
-        features.update(self._calculate_derived_features(features))
+        self._calculate_derived_features(features, features)
         
         return features
     
-    def _extract_transaction_features(self, transaction: Dict) -> Dict:
-        """Extract features from transaction data"""
-        features = {}
+    def extract_features_batch(self, transactions: List[Dict], user_histories: Dict = None,
+                               executor=None, chunk_size: int = 64) -> List[Dict]:
+        """
+        Extract features for a batch of transactions, each with its user's history
+        from user_histories. With an executor (a process pool), chunks of
+        chunk_size transactions are extracted in parallel; order is preserved.
+        """
+        user_histories = user_histories or {}
+        pairs = [(transaction, user_histories.get(transaction.get('user_id'), [])) for transaction in transactions]
+        
+        if executor is None:
+            return self._extract_pairs(pairs)
+        
+        chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+        return [features for chunk in executor.map(_extract_chunk, chunks) for features in chunk]
+    
+    def _extract_pairs(self, pairs: List[Tuple[Dict, List[Dict]]]) -> List[Dict]:
+        """
+        extract_features for (transaction, user_history) pairs. Transactions of
+        the same user share one history list, so its statistics are computed
+        once per list rather than once per transaction.
+        """
+        history_stats = {}
+        features_list = []
+        
+        for transaction, history in pairs:
+            stats = None
+            if history:
+                stats = history_stats.get(id(history))
+                if stats is None:
+                    stats = history_stats[id(history)] = self._history_statistics(history)
+            features_list.append(self.extract_features(transaction, history, stats))
+        
+        return features_list
+    
+    def features_to_frame(self, features_list: List[Dict]) -> pd.DataFrame:
+        """
+        Stage extracted features as one columnar frame (one row per dict, NaN where
+        a row lacks a feature) that the prediction and anomaly paths can share.
+        Columns follow first appearance; pandas pivots the dicts into column
+        arrays in one C-level pass.
+        """
+        return pd.DataFrame(features_list)
+    
+    def _extract_transaction_features(self, transaction: Dict, features: Dict = None) -> Dict:
+        """Extract features from transaction data (into features, when given)"""
+        if features is None:
+            features = {}
         
         # Amount-based features
         amount = transaction.get('amount', 0)
@@ -50,62 +194,124 @@ class FraudFeatureExtractor:
         
         # Payment method features
         payment_method = transaction.get('payment_method', '')
-        features['payment_method_credit_card'] = 1 if payment_method == 'credit_card' else 0
-        features['payment_method_digital'] = 1 if payment_method in ['khalti', 'esewa'] else 0
+        features['payment_method_credit_card'], features['payment_method_digital'] = \
+            PAYMENT_FEATURE_TABLE.get(payment_method, (0, 0))
+        
+        return features
+    
+    def _transaction_features_batch(self, transactions: List[Dict]) -> Dict[str, Any]:
+        """_extract_transaction_features for every transaction at once, as columns"""
+        # Amount-based features, with one log1p over the whole column
+        amount = np.array([t.get('amount', 0) for t in transactions])
+        features = {
+            'transaction_amount': amount,
+            'amount_log': np.log1p(amount),
+            
+            # Frequency features
+            'is_first_transaction': pd.Series([t.get('is_first', False) for t in transactions]),
+            'transaction_count_today': np.array([t.get('daily_count', 0) for t in transactions])
+        }
+        
+        # Payment method features, one table lookup per distinct method; code
+        # -1 (a None method) picks the trailing (0, 0)
+        codes, methods = pd.factorize(pd.Series([t.get('payment_method', '') for t in transactions], dtype=object))
+        payment = np.array([PAYMENT_FEATURE_TABLE.get(method, (0, 0)) for method in methods] + [(0, 0)],
+                           dtype=np.int64)[codes]
+        features['payment_method_credit_card'] = payment[:, 0]
+        features['payment_method_digital'] = payment[:, 1]
         
         return features
     
-    def _extract_user_behavior_features(self, transaction: Dict, history: List[Dict]) -> Dict:
-        """Extract features from user behavior history"""
+    def _extract_user_behavior_features(self, transaction: Dict, history: List[Dict],
+                                        history_stats: Tuple[Dict, List[float]] = None, features: Dict = None,
+                                        reference_time: float = None) -> Dict:
+        """
+        Extract features from user behavior history
+        
+        Args:
+            transaction: Current transaction
+            history: The user's earlier transactions
+            history_stats: _history_statistics(history), when the caller already
+                has it (e.g. for several transactions sharing one history)
+            features: Dict to write the features into (a new one by default)
+            reference_time: End of the velocity windows (see extract_features)
+        """
+        if features is None:
+            features = {}
         if not history:
-            return {}
+            return features
         
-        df = pd.DataFrame(history)
+        if history_stats is None:
+            history_stats = self._history_statistics(history)
+        history_stats, timestamps = history_stats
         
-        features = {}
+        for name in ('avg_transaction_amount', 'std_transaction_amount', 'total_transaction_count'):
+            features[name] = history_stats[name]
         
-        # Calculate statistics
-        if len(df) > 0:
-            features['avg_transaction_amount'] = df['amount'].mean()
-            features['std_transaction_amount'] = df['amount'].std()
-            features['total_transaction_count'] = len(df)
-            
-            # Current transaction compared to history
-            current_amount = transaction.get('amount', 0)
-            avg_amount = features['avg_transaction_amount']
-            
-            if avg_amount > 0:
-                features['amount_deviation_ratio'] = current_amount / avg_amount
-            else:
-                features['amount_deviation_ratio'] = 10  # High ratio for new users
-            
-            # Time between transactions
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                time_diffs = df['timestamp'].diff().dt.total_seconds()
-                features['avg_time_between_transactions'] = time_diffs.mean() if len(time_diffs) > 1 else 0
-            
-            # Failure rate
-            features['previous_failure_rate'] = (df['status'] == 'failed').mean()
+        # Current transaction compared to history
+        current_amount = transaction.get('amount', 0)
+        avg_amount = features['avg_transaction_amount']
         
-        # Velocity features
-        now = datetime.now()
-        last_hour = now.timestamp() - 3600
-        last_24h = now.timestamp() - 86400
+        if avg_amount > 0:
+            features['amount_deviation_ratio'] = current_amount / avg_amount
+        else:
+            features['amount_deviation_ratio'] = 10  # High ratio for new users
+        
+        # The remaining statistics follow in their own order
+        features.update(history_stats)
         
-        recent_hour = [t for t in history if t.get('timestamp', 0) > last_hour]
-        recent_day = [t for t in history if t.get('timestamp', 0) > last_24h]
+        # Velocity features: history timestamps after the window starts, by
+        # binary search in the sorted timestamps
+        if reference_time is None:
+            reference_time = _reference_time(transaction, time.time())
+        recent_hour = len(timestamps) - bisect.bisect_right(timestamps, reference_time - 3600)
+        recent_day = len(timestamps) - bisect.bisect_right(timestamps, reference_time - 86400)
         
-        features['transactions_last_hour'] = len(recent_hour)
-        features['transactions_last_24h'] = len(recent_day)
-        features['hourly_velocity'] = len(recent_hour) / 1  # per hour
-        features['daily_velocity'] = len(recent_day) / 24   # per hour
+        features['transactions_last_hour'] = recent_hour
+        features['transactions_last_24h'] = recent_day
+        features['hourly_velocity'] = recent_hour / 1  # per hour
+        features['daily_velocity'] = recent_day / 24   # per hour
         
         return features
     
-    def _extract_temporal_features(self, transaction: Dict) -> Dict:
-        """Extract time-based features"""
-        features = {}
+    def _history_statistics(self, history: List[Dict]) -> Tuple[Dict, List[float]]:
+        """
+        For a non-empty history, the user behavior features that depend on the
+        history alone (all but amount_deviation_ratio and the velocity
+        features), and its present timestamps sorted for the velocity windows
+        """
+        if len(history) < SMALL_HISTORY_SIZE:
+            mean, std, mean_gap, failure_rate, timestamps = _small_history_statistics(history)
+            timestamps.sort()
+        else:
+            # The history as flat arrays, reduced in one compiled scan
+            amount = np.array([t.get('amount') for t in history], dtype=float)
+            timestamps = np.array([t.get('timestamp') for t in history], dtype=float)
+            failed = np.fromiter((t.get('status') == 'failed' for t in history), dtype=bool, count=len(history))
+            mean, std, mean_gap, failure_rate = history_statistics(amount, timestamps, failed)
+            timestamps = np.sort(timestamps[~np.isnan(timestamps)]).tolist()
+        
+        # Calculate statistics
+        stats = {
+            'avg_transaction_amount': mean,
+            'std_transaction_amount': std,
+            'total_transaction_count': len(history)
+        }
+        
+        # Time between transactions
+        if any('timestamp' in t for t in history):
+            stats['avg_time_between_transactions'] = mean_gap if len(history) > 1 else 0
+        
+        # Failure rate
+        stats['previous_failure_rate'] = failure_rate
+        
+        return stats, timestamps
+    
+    @staticmethod
+    def _extract_temporal_features(transaction: Dict, features: Dict = None) -> Dict:
+        """Extract time-based features (into features, when given)"""
+        if features is None:
+            features = {}
         
         timestamp = transaction.get('timestamp', datetime.now().timestamp())
         dt = datetime.fromtimestamp(timestamp)
@@ -126,9 +332,38 @@ class FraudFeatureExtractor:
         
         return features
     
-    def _extract_technical_features(self, transaction: Dict) -> Dict:
-        """Extract device and network features"""
-        features = {}
+    def _temporal_features_batch(self, transactions: List[Dict]) -> Dict[str, np.ndarray]:
+        """_extract_temporal_features for every transaction at once, as columns"""
+        now = datetime.now().timestamp()
+        dt = _local_time(np.array([t.get('timestamp', now) for t in transactions], dtype=float))
+        
+        days = dt.astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        hour = (dt - days).astype(np.int64) // 3600
+        weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        month = months.astype(np.int64) % 12 + 1
+        
+        return {
+            # Time features
+            'hour_of_day': hour,
+            'day_of_week': weekday,
+            'day_of_month': (days - months).astype(np.int64) + 1,
+            'is_weekend': (weekday >= 5).astype(np.int64),
+            
+            # Time-based patterns
+            'is_night_hours': (hour < 6).astype(np.int64),
+            'is_business_hours': ((hour >= 9) & (hour < 17)).astype(np.int64),
+            
+            # Seasonality
+            'month': month,
+            'is_holiday_season': np.isin(month, [11, 12]).astype(np.int64)  # Nov-Dec
+        }
+    
+    @staticmethod
+    def _extract_technical_features(transaction: Dict, features: Dict = None) -> Dict:
+        """Extract device and network features (into features, when given)"""
+        if features is None:
+            features = {}
         
         device_info = transaction.get('device_info', {})
         ip_address = transaction.get('ip_address', '')
@@ -144,8 +379,7 @@ class FraudFeatureExtractor:
             features['ip_prefix'] = '.'.join(ip_address.split('.')[:2])
             
             # Hash for anonymization
-            ip_hash = hashlib.md5(ip_address.encode()).hexdigest()[:8]
-            features['ip_hash'] = int(ip_hash, 16) % 10000
+            features['ip_hash'] = _ip_hash(ip_address)
         
         # Session features
         session_duration = transaction.get('session_duration', 0)
@@ -154,79 +388,424 @@ class FraudFeatureExtractor:
         
         return features
     
-    def _calculate_derived_features(self, features: Dict) -> Dict:
-        """Calculate derived/engineered features"""
-        derived = {}
+    def _technical_features_batch(self, transactions: List[Dict]) -> Dict[str, Any]:
+        """
+        _extract_technical_features for every transaction at once, as columns.
+        Addresses repeat across transactions, so the IP features are computed
+        once per distinct address and spread to the rows by factorized code.
+        """
+        device_info = [t.get('device_info', {}) for t in transactions]
         
-        # Risk score components
-        risk_score = 0
+        # Device features
+        features = {
+            'device_type': [info.get('type', 'unknown') for info in device_info],
+            'browser': [info.get('browser', 'unknown') for info in device_info],
+            'os': [info.get('os', 'unknown') for info in device_info]
+        }
+        
+        # IP-based features (simplified), for rows with an address. Empty
+        # addresses are masked out up front, so only real ones are split and
+        # hashed; code -1 (a None address) picks the trailing NaN
+        codes, addresses = pd.factorize(pd.Series([t.get('ip_address', '') for t in transactions], dtype=object))
+        has_address = np.append(addresses.to_numpy().astype(bool), False)
+        if has_address.any():
+            present = addresses[has_address[:-1]].tolist()
+            ip_prefix = np.full(len(has_address), np.nan, dtype=object)
+            ip_prefix[has_address] = ['.'.join(address.split('.', 2)[:2]) for address in present]
+            ip_hash = np.full(len(has_address), np.nan)
+            ip_hash[has_address] = [_ip_hash(address) for address in present]
+            features['ip_prefix'] = ip_prefix[codes]
+            features['ip_hash'] = ip_hash[codes]
         
-        # High amount deviation
-        if features.get('amount_deviation_ratio', 1) > 3:
-            risk_score += 30
-            derived['high_amount_deviation'] = 1
-        else:
-            derived['high_amount_deviation'] = 0
+        # Session features
+        session_duration = np.array([t.get('session_duration', 0) for t in transactions])
+        features['session_duration'] = session_duration
+        features['short_session'] = (session_duration < 60).astype(np.int64)  # Less than 1 minute
         
-        # High velocity
-        if features.get('hourly_velocity', 0) > 5:
-            risk_score += 25
-            derived['high_hourly_velocity'] = 1
-        else:
-            derived['high_hourly_velocity'] = 0
+        return features
+    
+    def _calculate_derived_features(self, features: Dict, derived: Dict = None) -> Dict:
+        """Calculate derived/engineered features (into derived, when given, which may be features itself)"""
+        if derived is None:
+            derived = {}
         
+        # High amount deviation
+        derived['high_amount_deviation'] = int(features.get('amount_deviation_ratio', 1) > 3)
+        # High velocity
+        derived['high_hourly_velocity'] = int(features.get('hourly_velocity', 0) > 5)
         # Night hours
-        if features.get('is_night_hours', 0) == 1:
-            risk_score += 15
-            derived['night_transaction'] = 1
-        else:
-            derived['night_transaction'] = 0
-        
+        derived['night_transaction'] = int(features.get('is_night_hours', 0) == 1)
         # Short session
-        if features.get('short_session', 0) == 1:
-            risk_score += 20
-            derived['short_session_flag'] = 1
-        else:
-            derived['short_session_flag'] = 0
-        
+        derived['short_session_flag'] = int(features.get('short_session', 0) == 1)
         # Previous failures
-        if features.get('previous_failure_rate', 0) > 0.3:
-            risk_score += 25
-            derived['high_failure_history'] = 1
-        else:
-            derived['high_failure_history'] = 0
-        
+        derived['high_failure_history'] = int(features.get('previous_failure_rate', 0) > 0.3)
         # New user with high amount
-        if features.get('is_first_transaction', False) and features.get('transaction_amount', 0) > 100:
-            risk_score += 35
-            derived['new_user_high_amount'] = 1
-        else:
-            derived['new_user_high_amount'] = 0
+        derived['new_user_high_amount'] = int(bool(features.get('is_first_transaction', False)) and features.get('transaction_amount', 0) > 100)
         
+        # Risk score components
+        risk_score = sum(weight for flag, weight in RISK_WEIGHTS.items() if derived[flag])
         derived['composite_risk_score'] = min(risk_score, 100)
         
         return derived
     
-    def prepare_training_data(self, transactions: List[Dict], labels: List[int] = None) -> pd.DataFrame:
-        """Prepare data for model training"""
-        features_list = []
+    def _derived_features_batch(self, columns: Dict[str, Any], n: int) -> Dict[str, np.ndarray]:
+        """
+        _calculate_derived_features over whole columns: the flags form one 0/1
+        matrix and the composite risk score is its product with the weights.
+        Absent columns take the same defaults as absent keys.
+        """
+        def column(name: str, default) -> np.ndarray:
+            return np.asarray(columns[name], dtype=float) if name in columns else np.full(n, default, dtype=float)
+        
+        with np.errstate(invalid='ignore'):
+            flags = np.stack([
+                column('amount_deviation_ratio', 1) > 3,
+                column('hourly_velocity', 0) > 5,
+                column('is_night_hours', 0) == 1,
+                column('short_session', 0) == 1,
+                column('previous_failure_rate', 0) > 0.3,
+                pd.Series(columns['is_first_transaction']).astype(bool).to_numpy() & (column('transaction_amount', 0) > 100)
+            ], axis=1).astype(np.int64)
+        
+        derived = dict(zip(RISK_WEIGHTS, flags.T))
+        derived['composite_risk_score'] = np.minimum(flags @ np.array(list(RISK_WEIGHTS.values())), 100)
+        return derived
+    
+    def _user_behavior_features_batch(self, transactions: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        _extract_user_behavior_features for every transaction at once, as columns,
+        each with the earlier transactions of its user in the list as history.
+        The statistics are cumulative per-user reductions over one table instead
+        of a DataFrame per row. Rows without history are NaN, as are gaps for
+        histories without timestamps; columns no row has are left out.
+        """
+        # Users are told apart as the history lookup compares them (==)
+        user_codes = {}
+        df = pd.DataFrame({
+            'user': [user_codes.setdefault(t.get('user_id'), len(user_codes)) for t in transactions],
+            'amount': np.array([t.get('amount', np.nan) for t in transactions], dtype=float),
+            'timestamp': pd.to_datetime(pd.Series([t.get('timestamp', np.nan) for t in transactions])),
+            'has_timestamp': ['timestamp' in t for t in transactions],
+            'failed': [t.get('status') == 'failed' for t in transactions]
+        })
+        
+        if DUCKDB_AVAILABLE and len(df) >= DUCKDB_MIN_ROWS:
+            prior = _prior_aggregates_duckdb(df)
+        else:
+            prior = _prior_aggregates_pandas(df)
+        history_length = prior['history_length']
+        avg_amount = prior['avg_amount']
+        std_amount = prior['std_amount']
+        
+        # Velocity features: earlier transactions of the user within the hour
+        # and day before each transaction's own timestamp (the time of this
+        # call for rows without one)
+        now = time.time()
+        timestamps = np.array([t.get('timestamp') for t in transactions], dtype=float)
+        reference = np.array([_reference_time(t, now) for t in transactions])
+        users = df['user'].to_numpy()
+        recent_hour = prior_window_counts(users, timestamps, reference - 3600)
+        recent_day = prior_window_counts(users, timestamps, reference - 86400)
+        
+        current_amount = np.array([t.get('amount', 0) for t in transactions], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation_ratio = np.where(avg_amount > 0, current_amount / avg_amount, 10)  # High ratio for new users
+            failure_rate = prior['failures'] / history_length
+        
+        # Time between transactions: the mean gap between consecutive history
+        # entries, present when any of them carries a timestamp
+        avg_gap = np.where(history_length > 1, prior['avg_gap'], 0)
+        has_timestamps = prior['timed'] > 0
+        
+        if not history_length.any():
+            return {}
         
-        for i, transaction in enumerate(transactions):
-            # Get user history (previous transactions)
-            user_id = transaction.get('user_id')
-            user_history = []
-            
-            # In practice, you would fetch user history from database
-            # This is simplified
-            for j in range(i):
-                if transactions[j].get('user_id') == user_id:
-                    user_history.append(transactions[j])
-            
-            features = self.extract_features(transaction, user_history)
-            
-            if labels is not None and i < len(labels):
-                features['is_fraud'] = labels[i]
+        # Rows without history have no behavior features
+        def with_history(values: np.ndarray, mask: np.ndarray = history_length > 0) -> np.ndarray:
+            return np.where(mask, values, np.nan)
+        
+        features = {
+            'avg_transaction_amount': with_history(avg_amount),
+            'std_transaction_amount': with_history(std_amount),
+            'total_transaction_count': with_history(history_length),
+            'amount_deviation_ratio': with_history(deviation_ratio)
+        }
+        if has_timestamps.any():
+            features['avg_time_between_transactions'] = with_history(avg_gap, has_timestamps)
+        features['previous_failure_rate'] = with_history(failure_rate)
+        features['transactions_last_hour'] = with_history(recent_hour)
+        features['transactions_last_24h'] = with_history(recent_day)
+        features['hourly_velocity'] = with_history(recent_hour / 1)  # per hour
+        features['daily_velocity'] = with_history(recent_day / 24)   # per hour
+        
+        return features
+    
+    def _feature_columns(self, transactions: List[Dict]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        The prepare_training_data columns for transactions, as the transaction,
+        temporal, technical and derived columns, and the user behavior columns
+        """
+        columns = self._transaction_features_batch(transactions)
+        columns.update(self._temporal_features_batch(transactions))
+        
+        columns.update(self._technical_features_batch(transactions))
+        
+        # In practice, you would fetch user history from database.
+        # Here the behavior features over each row's history are computed for
+        # the whole list at once
+        behavior = self._user_behavior_features_batch(transactions)
+        columns.update(self._derived_features_batch({**columns, **behavior}, len(transactions)))
+        
+        return columns, behavior
+    
+    def _feature_columns_parallel(self, transactions: List[Dict], executor,
+                                  n_chunks: int) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        _feature_columns over user-partitioned chunks in executor. Chunks keep
+        list order, so each row sees the same history; the results are put
+        back in row order, with NaN where a chunk lacks a conditional column
+        (IP or history features), in the column order of the serial path.
+        """
+        # Users are told apart as the history lookup compares them (==)
+        user_codes = {}
+        chunk_ids = np.array([user_codes.setdefault(t.get('user_id'), len(user_codes)) for t in transactions]) % n_chunks
+        rows = [np.flatnonzero(chunk_ids == chunk) for chunk in range(n_chunks)]
+        rows = [chunk_rows for chunk_rows in rows if chunk_rows.size]
+        
+        results = list(executor.map(_feature_columns_chunk, [[transactions[i] for i in chunk_rows] for chunk_rows in rows]))
+        
+        def merge(part: int) -> Dict[str, Any]:
+            # A column missing from a chunk goes in right after the column that
+            # precedes it there, which keeps the serial order
+            names = []
+            for chunk_columns in (result[part] for result in results):
+                previous = -1
+                for name in chunk_columns:
+                    if name not in names:
+                        names.insert(previous + 1, name)
+                    previous = names.index(name)
+            if not names:
+                return {}
             
-            features_list.append(features)
+            frame = pd.concat([pd.DataFrame({name: np.asarray(values) for name, values in result[part].items()},
+                                            index=chunk_rows)
+                               for result, chunk_rows in zip(results, rows)])
+            frame = frame.reindex(index=np.arange(len(transactions)), columns=names)
+            return {name: frame[name].to_numpy() for name in names}
+        
+        return merge(0), merge(1)
+    
+    def prepare_training_data(self, transactions: List[Dict], labels: List[int] = None,
+                              return_arrow: bool = False, executor=None,
+                              n_chunks: int = None) -> Union[pd.DataFrame, "pa.Table"]:
+        """
+        Prepare data for model training. Each transaction's user history is the
+        earlier transactions of the same user in the list, and its velocity
+        windows end at its own timestamp, so results do not depend on when
+        training runs.
+        
+        The features are those of extract_features, built column by column for
+        the whole list; columns are ordered transaction, temporal, technical,
+        derived, is_fraud (when labeled), then the user behavior features that
+        rows with history have.
+        
+        Returns a pandas DataFrame, or with return_arrow a pyarrow Table built
+        from the column arrays without going through pandas (NaN stored as
+        null, categorical features dictionary-encoded).
+        
+        With an executor (a process pool), the transactions are split into
+        n_chunks (default: one per CPU) by user, so every history stays within
+        one chunk, and the chunks' columns are built in parallel.
+        """
+        if return_arrow and not PYARROW_AVAILABLE:
+            raise ImportError("return_arrow requires pyarrow")
+        if not transactions:
+            return pa.table({}) if return_arrow else pd.DataFrame()
+        
+        n = len(transactions)
+        if executor is None:
+            columns, behavior = self._feature_columns(transactions)
+        else:
+            columns, behavior = self._feature_columns_parallel(transactions, executor, n_chunks or os.cpu_count() or 1)
+        
+        if labels is not None and len(labels):
+            columns['is_fraud'] = list(labels[:n]) + [np.nan] * (n - len(labels))
+        
+        columns.update(behavior)
+        
+        # Compact dtypes; the derived flags above were computed at full precision
+        dtypes = {**dict.fromkeys(CATEGORICAL_FEATURES, 'category'),
+                  **dict.fromkeys(INT8_FEATURES, np.int8),
+                  **dict.fromkeys(FLOAT32_FEATURES, np.float32)}
         
-        return pd.DataFrame(features_list)
\ No newline at end of file
+        if return_arrow:
+            arrays = {}
+            for name, values in columns.items():
+                dtype = dtypes.get(name)
+                if dtype is not None and dtype != 'category':
+                    values = np.asarray(values, dtype=dtype)
+                array = pa.array(values, from_pandas=True)
+                arrays[name] = array.dictionary_encode() if dtype == 'category' else array
+            return pa.table(arrays)
+        
+        features_df = pd.DataFrame(columns)
+        features_df = features_df.astype({name: dtype for name, dtype in dtypes.items() if name in features_df})
+        
+        return features_df
+
+def _small_history_statistics(history: List[Dict]) -> Tuple[float, float, float, float, List[float]]:
+    """
+    history_statistics over the history dicts directly, for short histories,
+    plus the present timestamps
+    """
+    amounts = []
+    timestamps = []
+    failures = 0
+    gap_sum = 0.0
+    gap_count = 0
+    previous = None
+    
+    for t in history:
+        amount = t.get('amount')
+        if amount is not None and amount == amount:  # NaN != NaN
+            amounts.append(amount)
+        if t.get('status') == 'failed':
+            failures += 1
+        
+        timestamp = t.get('timestamp')
+        if timestamp is None or timestamp != timestamp:
+            previous = None
+            continue
+        timestamps.append(float(timestamp))
+        
+        # Gaps as pandas reads numeric timestamps: integer nanoseconds
+        ns = int(timestamp)
+        if previous is not None:
+            gap_sum += (ns - previous) / 1e9
+            gap_count += 1
+        previous = ns
+    
+    n = len(amounts)
+    mean = sum(amounts) / n if n else math.nan
+    std = math.sqrt(sum((a - mean) ** 2 for a in amounts) / (n - 1)) if n > 1 else math.nan
+    mean_gap = gap_sum / gap_count if gap_count else math.nan
+    return mean, std, mean_gap, failures / len(history), timestamps
+
+def _reference_time(transaction: Dict, now: float) -> float:
+    """The transaction's numeric timestamp, or now when it has none"""
+    try:
+        return float(transaction['timestamp'])
+    except (KeyError, TypeError, ValueError):
+        return now
+
+def _prior_aggregates_pandas(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    For each row, aggregates over the earlier rows of its user (see
+    _user_behavior_features_batch), with pandas groupby cumulative and
+    expanding reductions
+    """
+    users = df['user']
+    
+    # Mean gap between consecutive timestamps = gap sum / gap count, both
+    # running totals; gaps next to a missing timestamp are not counted
+    gaps = df.groupby(users, sort=False)['timestamp'].diff().dt.total_seconds()
+    df = df.assign(gap=gaps.fillna(0), has_gap=gaps.notna())
+    by_user = df.groupby(users, sort=False)
+    
+    def prior_cumsum(column: str) -> np.ndarray:
+        """Per-user running total of column over the earlier rows"""
+        values = df[column].to_numpy()
+        return by_user[column].cumsum().to_numpy() - values
+    
+    def prior_expanding(values: pd.Series, stat: str) -> np.ndarray:
+        """Per-user expanding statistic of values over the earlier rows (NaN-skipping)"""
+        prior = values.groupby(users, sort=False).shift()
+        expanding = getattr(prior.groupby(users, sort=False).expanding(), stat)()
+        return expanding.droplevel(0).sort_index().to_numpy()
+    
+    gap_count = prior_cumsum('has_gap')
+    return {
+        'history_length': by_user.cumcount().to_numpy(),
+        'avg_amount': prior_expanding(df['amount'], 'mean'),
+        'std_amount': prior_expanding(df['amount'], 'std'),
+        'avg_gap': prior_cumsum('gap') / np.where(gap_count > 0, gap_count, np.nan),
+        'failures': prior_cumsum('failed'),
+        'timed': prior_cumsum('has_timestamp')
+    }
+
+def _prior_aggregates_duckdb(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    _prior_aggregates_pandas as one DuckDB query: each aggregate is a window
+    over the earlier rows of the user's partition, in list order. NaN amounts
+    and NaT timestamps go in as NULL, which the aggregates skip like pandas.
+    """
+    table = pd.DataFrame({
+        'row': np.arange(len(df)),
+        'user': df['user'],
+        'amount': df['amount'].astype('Float64'),
+        'ts': df['timestamp'].astype('int64').where(df['timestamp'].notna()).astype('Int64'),
+        'has_timestamp': df['has_timestamp'],
+        'failed': df['failed']
+    })
+    
+    con = duckdb.connect()
+    try:
+        con.register('tx', table)
+        result = con.execute("""
+            SELECT
+                COUNT(*) OVER prior AS history_length,
+                AVG(amount) OVER prior AS avg_amount,
+                STDDEV_SAMP(amount) OVER prior AS std_amount,
+                AVG(gap) OVER prior AS avg_gap,
+                COALESCE(SUM(failed::INTEGER) OVER prior, 0)::BIGINT AS failures,
+                COALESCE(SUM(has_timestamp::INTEGER) OVER prior, 0)::BIGINT AS timed
+            FROM (
+                SELECT *, (ts - LAG(ts) OVER (PARTITION BY "user" ORDER BY "row")) / 1e9 AS gap
+                FROM tx
+            )
+            WINDOW prior AS (PARTITION BY "user" ORDER BY "row" ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+            ORDER BY "row"
+        """).df()
+    finally:
+        con.close()
+    
+    return {name: result[name].to_numpy() for name in result.columns}
+
+def _context_key(transaction: Dict) -> Optional[tuple]:
+    """
+    The fields temporal and technical features are computed from, or None when
+    they cannot be cached: no timestamp (it defaults to the current time) or an
+    unhashable value
+    """
+    if 'timestamp' not in transaction:
+        return None
+    
+    device_info = transaction.get('device_info', {})
+    key = (transaction['timestamp'], transaction.get('ip_address', ''), transaction.get('session_duration', 0),
+           device_info.get('type', 'unknown'), device_info.get('browser', 'unknown'), device_info.get('os', 'unknown'))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+@lru_cache(maxsize=CONTEXT_CACHE_SIZE)
+def _context_features(key: tuple) -> Dict:
+    """Temporal and technical features of a context key from _context_key; callers copy, never mutate"""
+    timestamp, ip_address, session_duration, device_type, browser, os_name = key
+    transaction = {
+        'timestamp': timestamp,
+        'ip_address': ip_address,
+        'session_duration': session_duration,
+        'device_info': {'type': device_type, 'browser': browser, 'os': os_name}
+    }
+    features = FraudFeatureExtractor._extract_temporal_features(transaction)
+    return FraudFeatureExtractor._extract_technical_features(transaction, features)
+
+def _feature_columns_chunk(transactions: List[Dict]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Process pool entry point: prepare_training_data columns for one user-partitioned chunk"""
+    return FraudFeatureExtractor()._feature_columns(transactions)
+
+def _extract_chunk(pairs: List[Tuple[Dict, List[Dict]]]) -> List[Dict]:
+    """Process pool entry point: features for (transaction, user_history) pairs"""
+    return FraudFeatureExtractor()._extract_pairs(pairs)
@@ -3,26 +3,177 @@ Fraud Prediction Module
 Predicts fraudulent transactions using trained ML models
 """
 
-import pickle
+import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import json
 import os
+import re
 import sys
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 import warnings
 warnings.filterwarnings('ignore')
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from fraud._kernels import rule_masks
+
 try:
-    from fraud.feature_extractor import FraudFeatureExtractor
+    from fraud.feature_extractor import FraudFeatureExtractor, _extract_chunk
     from fraud.anomaly_detector import AnomalyDetector
 except ImportError:
     print("Note: FeatureExtractor and AnomalyDetector not found, using basic functionality")
 
+# ONNX Runtime is optional: .onnx model files are served through it, and
+# skl2onnx exports trained scikit-learn models to that format
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from skl2onnx import to_onnx
+    SKL2ONNX_AVAILABLE = True
+except ImportError:
+    SKL2ONNX_AVAILABLE = False
+
+# zlib level for saved models. Uncompressed (0) files have their arrays
+# memory-mapped read-only by load_model, so workers share the pages; levels
+# 1-9 give smaller files that are read fully into memory instead
+MODEL_COMPRESSION = 0
+
+# Model probabilities kept per FraudPredictor, keyed by feature vector
+PREDICTION_CACHE_SIZE = 50_000
+
+# Rule-based detection: (risk factor, points) per rule, in the order the rules
+# are checked; bit i of a rule_masks mask is RULES[i]
+RULES = (
+    ('EXTREME_AMOUNT_DEVIATION', 40),
+    ('HIGH_AMOUNT_DEVIATION', 25),
+    ('EXTREME_TRANSACTION_VELOCITY', 35),
+    ('HIGH_TRANSACTION_VELOCITY', 20),
+    ('NIGHT_TRANSACTION', 15),
+    ('SHORT_SESSION', 20),
+    ('NEW_USER_HIGH_AMOUNT', 30),
+    ('HIGH_FAILURE_HISTORY', 25)
+)
+
+# (risk factors, risk score) for every rule mask
+RULE_OUTCOMES = tuple(
+    ([name for bit, (name, _) in enumerate(RULES) if mask >> bit & 1],
+     sum(points for bit, (_, points) in enumerate(RULES) if mask >> bit & 1))
+    for mask in range(1 << len(RULES))
+)
+
+# explain_prediction factors, in reporting order: (flag feature, risk factor,
+# points, feature shown in the reason and its default, reason template)
+EXPLANATION_FACTORS = (
+    ('high_amount_deviation', 'HIGH_AMOUNT_DEVIATION', 30, 'amount_deviation_ratio', 1,
+     "Amount is {:.1f}x higher than user's average"),
+    ('high_hourly_velocity', 'HIGH_TRANSACTION_VELOCITY', 25, 'hourly_velocity', 0,
+     "High transaction frequency ({:.1f}/hour)"),
+    ('night_transaction', 'NIGHT_TRANSACTION', 15, 'hour_of_day', 0,
+     "Transaction occurred during unusual hours ({}:00)"),
+    ('short_session_flag', 'SHORT_SESSION', 20, 'session_duration', 0,
+     "Very short session duration ({}s)"),
+    ('high_failure_history', 'HIGH_FAILURE_HISTORY', 25, 'previous_failure_rate', 0,
+     "High previous failure rate ({:.0%})"),
+    ('new_user_high_amount', 'NEW_USER_HIGH_AMOUNT', 35, 'transaction_amount', 0,
+     "New user with high amount (${:.2f})"),
+    # Device anomalies, when the extractor reports them
+    ('device_anomaly', 'DEVICE_ANOMALY', 20, None, None,
+     "Unusual device or location pattern")
+)
+
+# Features the model input always has (simplified); missing ones are 0
+EXPECTED_COLUMNS = (
+    'transaction_amount', 'amount_log', 'hour_of_day', 'day_of_week',
+    'is_weekend', 'is_night_hours', 'session_duration', 'short_session',
+    'total_transaction_count', 'amount_deviation_ratio', 'hourly_velocity',
+    'previous_failure_rate', 'composite_risk_score'
+)
+
+# Features redacted from prediction output: names containing any of these,
+# in any case
+SENSITIVE_FEATURE_PATTERN = re.compile('password|token|secret|key|cvv|pin', re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
+def _parse_iso(timestamp: str) -> float:
+    """Epoch seconds of an ISO 8601 timestamp ('Z' accepted for UTC)"""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+@lru_cache(maxsize=4096)
+def _utc_offset(quarter_hour: int) -> int:
+    """Local UTC offset in seconds during a quarter hour since the epoch (offsets change on quarter hours)"""
+    return time.localtime(quarter_hour * 900).tm_gmtoff
+
+def _local_hour_weekday(timestamp: float) -> Tuple[int, int]:
+    """(hour, weekday) of epoch seconds in local time, as datetime.fromtimestamp gives them"""
+    seconds = int(timestamp // 1)
+    local = seconds + _utc_offset(seconds // 900)
+    return local // 3600 % 24, (local // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+
+@lru_cache(maxsize=None)
+def _is_sensitive(feature_name: str) -> bool:
+    # Feature names repeat across transactions, so each is matched once
+    return SENSITIVE_FEATURE_PATTERN.search(feature_name) is not None
+
+@lru_cache(maxsize=8)
+def _row_reader(columns: Tuple) -> Callable[[Dict], tuple]:
+    """
+    Function returning a feature dictionary's values for columns (0 where
+    missing) as a tuple, generated once per model schema so that a row is
+    read with one expression of direct get calls instead of a loop
+    """
+    source = ("def read_row(features):\n"
+              "    get = features.get\n"
+              "    return (" + "".join(f"get({column!r}, 0), " for column in columns) + ")\n")
+    namespace = {}
+    exec(source, namespace)
+    return namespace['read_row']
+
+def _feature_key(features: Dict) -> Optional[tuple]:
+    """Hashable key of a feature dictionary, or None when a value is unhashable"""
+    key = tuple(sorted(features.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+class _OnnxModel:
+    """
+    predict_proba over an ONNX Runtime session, for FraudPredictor to use in
+    place of the scikit-learn model it was exported from
+    """
+    
+    def __init__(self, model_path: str):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("Loading .onnx models requires onnxruntime")
+        
+        # One thread per session: requests are already spread across workers
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.probability_name = self.session.get_outputs()[1].name
+        
+        # Training columns, recorded by FraudPredictor.export_onnx
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if 'feature_names' in metadata:
+            self.feature_names_in_ = np.array(json.loads(metadata['feature_names']), dtype=object)
+    
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self.session.run([self.probability_name], {self.input_name: X})[0]
+
 class FraudPredictor:
     def __init__(self, model_path: str = None, config: Dict = None):
         """
@@ -47,10 +198,16 @@ class FraudPredictor:
             }
         }
         
-        self.model = None
-        self.model_loaded = False
+        self._model = None
+        self._model_loaded = False
+        # Model file found at construction, loaded on first use of the model
+        self._pending_model_path = None
+        self._model_lock = threading.Lock()
         self.feature_extractor = None
         self.anomaly_detector = None
+        # feature key -> model fraud probability, LRU ordered; cleared when the model changes
+        self._prediction_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         # Initialize components
         self._initialize_components(model_path)
@@ -69,9 +226,10 @@ class FraudPredictor:
         except:
             print("Warning: Could not initialize AnomalyDetector")
         
-        # Load model
+        # Find the model; it is loaded when first needed, so workers that
+        # never predict with it (or only use the rules) skip the unpickling
         if model_path and os.path.exists(model_path):
-            self.load_model(model_path)
+            self._pending_model_path = model_path
         else:
             # Try default paths
             default_paths = [
@@ -82,12 +240,41 @@ class FraudPredictor:
             
             for path in default_paths:
                 if os.path.exists(path):
-                    self.load_model(path)
+                    self._pending_model_path = path
                     break
         
-        if not self.model_loaded:
+        if self._pending_model_path is None:
             print("Warning: No model loaded, using rule-based detection")
     
+    @property
+    def model(self):
+        if self._pending_model_path is not None:
+            self._load_pending_model()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._pending_model_path = None
+        self._model = model
+        # Cached probabilities belong to the model that computed them
+        self.clear_prediction_cache()
+    
+    @property
+    def model_loaded(self) -> bool:
+        if self._pending_model_path is not None:
+            self._load_pending_model()
+        return self._model_loaded
+    
+    @model_loaded.setter
+    def model_loaded(self, loaded: bool):
+        self._model_loaded = loaded
+    
+    def _load_pending_model(self):
+        """Load the model found at construction; other threads wait for it"""
+        with self._model_lock:
+            if self._pending_model_path is not None:
+                self.load_model(self._pending_model_path)
+    
     def load_model(self, model_path: str) -> bool:
         """
         Load trained model from file
@@ -99,15 +286,19 @@ class FraudPredictor:
             Boolean indicating success
         """
         try:
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            if model_path.endswith('.onnx'):
+                self._model = _OnnxModel(model_path)
+            else:
+                # Also reads models pickled before the switch to joblib
+                self._model = joblib.load(model_path, mmap_mode='r')
             
-            self.model_loaded = True
+            self.clear_prediction_cache()
+            self._model_loaded = True
             self.model_path = model_path
             print(f"✅ Model loaded from {model_path}")
             
             # Initialize anomaly detector with model if available
-            if self.anomaly_detector and hasattr(self.model, 'feature_importances_'):
+            if self.anomaly_detector and hasattr(self._model, 'feature_importances_'):
                 # Get feature importances for anomaly detection
                 pass
             
@@ -115,15 +306,30 @@ class FraudPredictor:
             
         except Exception as e:
             print(f"❌ Error loading model: {e}")
-            self.model_loaded = False
+            self._model_loaded = False
             return False
+        
+        finally:
+            # Cleared last, so threads that saw it set wait on _model_lock
+            # rather than reading a half-loaded model
+            self._pending_model_path = None
+    
+    def clear_prediction_cache(self):
+        """
+        Forget the cached model probabilities; loading or assigning a model
+        does this itself
+        """
+        with self._cache_lock:
+            self._prediction_cache.clear()
     
-    def save_model(self, model_path: str) -> bool:
+    def save_model(self, model_path: str, compress: int = MODEL_COMPRESSION) -> bool:
         """
         Save current model to file
         
         Args:
             model_path: Path to save model
+            compress: zlib level (0-9); 0 saves a file that loads memory-mapped,
+                higher levels a smaller one that does not
         
         Returns:
             Boolean indicating success
@@ -136,8 +342,7 @@ class FraudPredictor:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(model_path), exist_ok=True)
             
-            with open(model_path, 'wb') as f:
-                pickle.dump(self.model, f)
+            joblib.dump(self.model, model_path, compress=compress)
             
             print(f"✅ Model saved to {model_path}")
             return True
@@ -146,6 +351,47 @@ class FraudPredictor:
             print(f"❌ Error saving model: {e}")
             return False
     
+    def export_onnx(self, model_path: str) -> bool:
+        """
+        Export the current scikit-learn model to ONNX, with its training
+        columns as metadata, for load_model to serve through ONNX Runtime
+        
+        Args:
+            model_path: Path to save the .onnx file
+        
+        Returns:
+            Boolean indicating success
+        """
+        if not SKL2ONNX_AVAILABLE:
+            print("Exporting to ONNX requires skl2onnx")
+            return False
+        if not self.model:
+            print("No model to export")
+            return False
+        
+        try:
+            os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+            
+            # Probabilities as a plain tensor rather than a list of dicts
+            onnx_model = to_onnx(self.model, np.zeros((1, self.model.n_features_in_), dtype=np.float32),
+                                 options={'zipmap': False}, target_opset=15)
+            
+            feature_names = getattr(self.model, 'feature_names_in_', None)
+            if feature_names is not None:
+                entry = onnx_model.metadata_props.add()
+                entry.key = 'feature_names'
+                entry.value = json.dumps([str(name) for name in feature_names])
+            
+            with open(model_path, 'wb') as f:
+                f.write(onnx_model.SerializeToString())
+            
+            print(f"✅ Model exported to {model_path}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error exporting model: {e}")
+            return False
+    
     def predict(self, features: Dict) -> Tuple[bool, float, Dict]:
         """
         Predict if transaction is fraudulent
@@ -156,69 +402,214 @@ class FraudPredictor:
         Returns:
             Tuple of (is_fraud, probability, explanation)
         """
+        return self.predict_many([features])[0]
+    
+    def predict_many(self, features_list: List[Dict], feature_df: pd.DataFrame = None) -> List[Tuple[bool, float, Dict]]:
+        """
+        Predict a batch of feature dictionaries with a single model call
+        
+        Args:
+            features_list: List of transaction feature dictionaries
+            feature_df: Optional frame of the same features, one row per dict
+                (see FraudFeatureExtractor.features_to_frame), used as model input
+        
+        Returns:
+            List of (is_fraud, probability, explanation) tuples, one per input as predict returns
+        """
+        if not features_list:
+            return []
+        
         try:
-            # If model is loaded, use it
             if self.model_loaded and self.model:
-                # Convert features to DataFrame
-                feature_df = pd.DataFrame([features])
-                
-                # Ensure all required features are present
-                feature_df = self._ensure_feature_columns(feature_df)
-                
-                # Make prediction
-                if hasattr(self.model, 'predict_proba'):
-                    probabilities = self.model.predict_proba(feature_df)[0]
-                    fraud_probability = float(probabilities[1])  # Assuming index 1 is fraud
-                else:
-                    prediction = self.model.predict(feature_df)[0]
-                    fraud_probability = 1.0 if prediction == 1 else 0.0
-                
-                is_fraud = fraud_probability >= self.config['threshold']
+                probabilities = self._model_probabilities(features_list, feature_df)
+                is_fraud = np.asarray(probabilities) >= self.config['threshold']
                 
-                # Generate explanation
-                explanation = self.explain_prediction(features, fraud_probability)
-                
-                return is_fraud, fraud_probability, explanation
+                return [(flag, probability, self.explain_prediction(features, probability))
+                        for features, probability, flag in zip(features_list, probabilities, is_fraud.tolist())]
+            
+            return self._rule_based_predictions(features_list)
             
-            else:
-                # Fallback to rule-based prediction
-                return self._rule_based_prediction(features)
-                
         except Exception as e:
-            print(f"Prediction error: {e}")
+            print(f"Batch prediction error: {e}")
+            if len(features_list) > 1:
+                # Retry one at a time, so only the rows that fail fall back
+                return [self.predict(features) for features in features_list]
             # Fallback to rule-based
-            return self._rule_based_prediction(features)
+            return self._rule_based_predictions(features_list)
+    
+    def _model_probabilities(self, features_list: List[Dict], feature_df: pd.DataFrame = None) -> List[float]:
+        """
+        Model fraud probability for each feature dictionary. Feature vectors seen
+        before are served from the prediction cache; the rest go through the model
+        in one call, taking their rows from feature_df when it is given.
+        """
+        keys = [_feature_key(features) for features in features_list]
+        probabilities = [None] * len(features_list)
+        
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                if key is not None and key in self._prediction_cache:
+                    self._prediction_cache.move_to_end(key)
+                    probabilities[i] = self._prediction_cache[key]
+        
+        misses = [i for i, probability in enumerate(probabilities) if probability is None]
+        if not misses:
+            return probabilities
+        
+        model_input = self._model_input([features_list[i] for i in misses],
+                                        feature_df.iloc[misses] if feature_df is not None else None)
+        
+        if hasattr(self.model, 'predict_proba'):
+            computed = self.model.predict_proba(model_input)[:, 1]  # Assuming index 1 is fraud
+        else:
+            computed = (self.model.predict(model_input) == 1).astype(float)
+        
+        with self._cache_lock:
+            for i, probability in zip(misses, computed):
+                probabilities[i] = float(probability)
+                if keys[i] is not None:
+                    self._prediction_cache[keys[i]] = probabilities[i]
+            while len(self._prediction_cache) > PREDICTION_CACHE_SIZE:
+                self._prediction_cache.popitem(last=False)
+        
+        return probabilities
     
-    def predict_batch(self, transactions: List[Dict], user_history: Dict = None) -> List[Dict]:
+    def _model_input(self, features_list: List[Dict], feature_df: pd.DataFrame = None):
+        """
+        Model input rows for feature dictionaries, with the columns of
+        _ensure_feature_columns and features some rows lack as 0. Models that
+        know their feature names get a DataFrame (read from the dictionaries by
+        a reader generated for those names unless feature_df is given); others
+        a float32 array built straight from the dictionaries (or from
+        feature_df when given).
+        """
+        columns = getattr(self.model, 'feature_names_in_', None)
+        if feature_df is None and columns is not None:
+            # The model's columns are known, so read them from each dict
+            # straight into one array rather than going through a frame
+            read_row = _row_reader(tuple(columns))
+            rows = np.array([read_row(features) for features in features_list], dtype=np.float64)
+            rows[np.isnan(rows)] = 0
+            return pd.DataFrame(rows.reshape(len(features_list), len(columns)), columns=columns)
+        
+        if feature_df is not None or hasattr(self.model, 'feature_names_in_'):
+            if feature_df is None:
+                feature_df = pd.DataFrame(features_list)
+            feature_df = self._ensure_feature_columns(feature_df).fillna(0)
+            return feature_df if hasattr(self.model, 'feature_names_in_') else feature_df.to_numpy(dtype=np.float32)
+        
+        # Present features in first-seen order, then the missing expected ones
+        columns = dict.fromkeys(key for features in features_list for key in features)
+        columns.update(dict.fromkeys(EXPECTED_COLUMNS))
+        
+        n_rows, n_cols = len(features_list), len(columns)
+        model_input = np.fromiter((features.get(col, 0) for features in features_list for col in columns),
+                                  dtype=np.float32, count=n_rows * n_cols).reshape(n_rows, n_cols)
+        model_input[np.isnan(model_input)] = 0
+        return model_input
+    
+    def detect_anomalies(self, feature_df: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Anomaly flags and scores for a batch of extracted features
+        
+        Args:
+            feature_df: Frame of transaction features, one row per transaction
+                (see FraudFeatureExtractor.features_to_frame); its numeric columns
+                are the detector input, with missing features as 0
+        
+        Returns:
+            (anomalies, scores) as AnomalyDetector.detect returns them, or None
+            when no fitted anomaly detector is available
+        """
+        if self.anomaly_detector is None or not self.anomaly_detector.is_fitted:
+            return None
+        
+        feature_matrix = feature_df.select_dtypes(include=[np.number]).fillna(0).to_numpy(dtype=np.float32)
+        return self.anomaly_detector.detect(feature_matrix)
+    
+    def predict_batch(self, transactions: List[Dict], user_history: Dict = None,
+                      executor=None, chunk_size: int = 64) -> List[Dict]:
         """
         Predict fraud for multiple transactions
         
         Args:
             transactions: List of transaction dictionaries
             user_history: Optional dictionary of user transaction history
+            executor: Optional process pool; with the FraudFeatureExtractor,
+                features are extracted there in chunks of chunk_size transactions
+            chunk_size: Transactions per executor task
         
         Returns:
             List of prediction results
         """
-        results = []
+        results = [None] * len(transactions)
         
+        # One clock reading for the whole batch, and each user's history
+        # converted to arrays once for all of their transactions
+        now = time.time()
+        now_iso = datetime.fromtimestamp(now).isoformat()
+        history_arrays = {}
+        
+        histories = []
+        for transaction in transactions:
+            user_id = transaction.get('user_id')
+            histories.append(user_history[user_id] if user_history and user_id and user_id in user_history else [])
+        
+        parallel_features = {}
+        if executor is not None and isinstance(self.feature_extractor, FraudFeatureExtractor):
+            parallel_features = self._extract_parallel(transactions, histories, executor, chunk_size)
+        
+        # Extract features for every transaction first
+        extracted = []
         for i, transaction in enumerate(transactions):
+            if i in parallel_features:
+                extracted.append((i, parallel_features[i]))
+                continue
+            
             try:
-                # Get user history for this transaction
-                user_id = transaction.get('user_id')
-                history = []
-                
-                if user_history and user_id and user_id in user_history:
-                    history = user_history[user_id]
+                history = histories[i]
                 
                 # Extract features
                 if self.feature_extractor:
                     features = self.feature_extractor.extract_features(transaction, history)
                 else:
-                    features = self._extract_basic_features(transaction, history)
+                    arrays = None
+                    if history:
+                        arrays = history_arrays.get(id(history))
+                        if arrays is None:
+                            arrays = history_arrays[id(history)] = self._history_arrays(history)
+                    features = self._extract_basic_features(transaction, history, now, arrays)
                 
-                # Make prediction
-                is_fraud, probability, explanation = self.predict(features)
+                extracted.append((i, features))
+                
+            except Exception as e:
+                results[i] = self._error_result(transaction, i, e)
+        
+        # Then predict them together: one frame, one model call
+        features_list = [features for _, features in extracted]
+        feature_df = pd.DataFrame(features_list)
+        try:
+            predictions = self.predict_many(features_list, feature_df)
+        except Exception:
+            # A row failed even the rule-based fallback; predict each row on
+            # its own below, so only the failing ones become error results
+            predictions = None
+        
+        # Add anomaly detection if available
+        anomaly_detection = None
+        if self.anomaly_detector and self.model_loaded and features_list:
+            try:
+                anomaly_detection = self.detect_anomalies(feature_df)
+            except:
+                pass
+        
+        for k, (i, features) in enumerate(extracted):
+            transaction = transactions[i]
+            try:
+                if predictions is not None:
+                    is_fraud, probability, explanation = predictions[k]
+                else:
+                    is_fraud, probability, explanation = self.predict(features)
                 
                 # Calculate risk score
                 risk_score = self._calculate_risk_score(features, probability)
@@ -227,9 +618,9 @@ class FraudPredictor:
                 # Generate result
                 result = {
                     'transaction_id': transaction.get('id', f'txn_{i}'),
-                    'user_id': user_id,
+                    'user_id': transaction.get('user_id'),
                     'amount': transaction.get('amount'),
-                    'timestamp': transaction.get('timestamp', datetime.now().isoformat()),
+                    'timestamp': transaction.get('timestamp', now_iso),
                     'prediction': {
                         'is_fraud': bool(is_fraud),
                         'probability': float(probability),
@@ -245,33 +636,50 @@ class FraudPredictor:
                     'features': self._sanitize_features(features)
                 }
                 
-                # Add anomaly detection if available
-                if self.anomaly_detector and self.model_loaded:
-                    try:
-                        # Convert features to array for anomaly detection
-                        feature_array = self._features_to_array(features)
-                        if feature_array is not None:
-                            anomalies, scores = self.anomaly_detector.detect(feature_array.reshape(1, -1))
-                            result['anomaly_detection'] = {
-                                'is_anomaly': bool(anomalies[0]),
-                                'anomaly_score': float(scores[0])
-                            }
-                    except:
-                        pass
+                if anomaly_detection is not None:
+                    anomalies, scores = anomaly_detection
+                    result['anomaly_detection'] = {
+                        'is_anomaly': bool(anomalies[k]),
+                        'anomaly_score': float(scores[k])
+                    }
                 
-                results.append(result)
+                results[i] = result
                 
             except Exception as e:
-                print(f"Error processing transaction {i}: {e}")
-                # Add error result
-                results.append({
-                    'transaction_id': transaction.get('id', f'txn_{i}'),
-                    'error': str(e),
-                    'success': False
-                })
+                results[i] = self._error_result(transaction, i, e)
         
         return results
     
+    def _extract_parallel(self, transactions: List[Dict], histories: List[List[Dict]],
+                          executor, chunk_size: int) -> Dict[int, Dict]:
+        """
+        Features of transactions by index, extracted in executor. Small chunks
+        keep the workers evenly loaded when history sizes are skewed; a chunk
+        that fails is left out, so predict_batch redoes it one transaction at a
+        time and reports the failing ones individually.
+        """
+        starts = range(0, len(transactions), chunk_size)
+        futures = [executor.submit(_extract_chunk, list(zip(transactions[start:start + chunk_size],
+                                                            histories[start:start + chunk_size])))
+                   for start in starts]
+        
+        features = {}
+        for start, future in zip(starts, futures):
+            try:
+                features.update(enumerate(future.result(), start))
+            except Exception:
+                pass
+        return features
+    
+    def _error_result(self, transaction: Dict, i: int, error: Exception) -> Dict:
+        """predict_batch result for a transaction that could not be processed"""
+        print(f"Error processing transaction {i}: {error}")
+        return {
+            'transaction_id': transaction.get('id', f'txn_{i}'),
+            'error': str(error),
+            'success': False
+        }
+    
     def _rule_based_prediction(self, features: Dict) -> Tuple[bool, float, Dict]:
         """
         Rule-based fraud prediction (fallback when model is not available)
@@ -282,132 +690,137 @@ class FraudPredictor:
         Returns:
             Tuple of (is_fraud, probability, explanation)
         """
-        risk_factors = []
-        risk_score = 0
-        
-        # Rule 1: High amount deviation
-        amount_deviation = features.get('amount_deviation_ratio', 1)
-        if amount_deviation > 5:
-            risk_score += 40
-            risk_factors.append('EXTREME_AMOUNT_DEVIATION')
-        elif amount_deviation > 3:
-            risk_score += 25
-            risk_factors.append('HIGH_AMOUNT_DEVIATION')
-        
-        # Rule 2: High velocity
-        hourly_velocity = features.get('hourly_velocity', 0)
-        if hourly_velocity > 10:
-            risk_score += 35
-            risk_factors.append('EXTREME_TRANSACTION_VELOCITY')
-        elif hourly_velocity > 5:
-            risk_score += 20
-            risk_factors.append('HIGH_TRANSACTION_VELOCITY')
-        
-        # Rule 3: Night hours
-        if features.get('is_night_hours', 0) == 1:
-            risk_score += 15
-            risk_factors.append('NIGHT_TRANSACTION')
-        
-        # Rule 4: Short session
-        if features.get('short_session', 0) == 1:
-            risk_score += 20
-            risk_factors.append('SHORT_SESSION')
-        
-        # Rule 5: New user with high amount
-        if features.get('is_first_transaction', False) and features.get('transaction_amount', 0) > 100:
-            risk_score += 30
-            risk_factors.append('NEW_USER_HIGH_AMOUNT')
-        
-        # Rule 6: Multiple payment failures
-        failure_rate = features.get('previous_failure_rate', 0)
-        if failure_rate > 0.5:
-            risk_score += 25
-            risk_factors.append('HIGH_FAILURE_HISTORY')
-        
-        # Calculate probability (0 to 1)
-        probability = min(risk_score / 100, 1.0)
-        
-        # Determine if fraud
-        is_fraud = probability >= self.config['threshold']
-        
-        # Generate explanation
-        explanation = {
-            'method': 'rule_based',
-            'risk_factors': risk_factors,
-            'risk_score': risk_score,
-            'rules_applied': len(risk_factors),
-            'confidence': probability * 100
-        }
-        
-        return is_fraud, probability, explanation
+        return self._rule_based_predictions([features])[0]
     
-    def _extract_basic_features(self, transaction: Dict, history: List[Dict] = None) -> Dict:
-        """Extract basic features without feature extractor"""
-        features = {}
+    def _rule_based_predictions(self, features_list: List[Dict]) -> List[Tuple[bool, float, Dict]]:
+        """
+        _rule_based_prediction for a batch: the rule inputs are gathered into one
+        array and all rules are evaluated by one compiled kernel (see RULES)
+        """
+        values = [(features.get('amount_deviation_ratio', 1),
+                   features.get('hourly_velocity', 0),
+                   features.get('is_night_hours', 0),
+                   features.get('short_session', 0),
+                   bool(features.get('is_first_transaction', False)),
+                   features.get('transaction_amount', 0),
+                   features.get('previous_failure_rate', 0)) for features in features_list]
+        masks = rule_masks(np.array(values, dtype=np.float64))
         
-        # Transaction features
-        features['transaction_amount'] = transaction.get('amount', 0)
-        features['amount_log'] = np.log1p(features['transaction_amount'])
+        results = []
+        for mask in masks.tolist():
+            risk_factors, risk_score = RULE_OUTCOMES[mask]
+            
+            # Calculate probability (0 to 1)
+            probability = min(risk_score / 100, 1.0)
+            
+            # Determine if fraud
+            is_fraud = probability >= self.config['threshold']
+            
+            # Generate explanation
+            explanation = {
+                'method': 'rule_based',
+                'risk_factors': list(risk_factors),
+                'risk_score': risk_score,
+                'rules_applied': len(risk_factors),
+                'confidence': probability * 100
+            }
+            results.append((is_fraud, probability, explanation))
+        
+        return results
+    
+    def _history_arrays(self, history: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        A user history as arrays for _extract_basic_features: the non-zero
+        amounts, the timestamps (0 where missing) and failure flags
+        """
+        return {
+            'amounts': np.array([h['amount'] for h in history if h.get('amount')], dtype=float),
+            'timestamps': np.array([h.get('timestamp', 0) for h in history], dtype=float),
+            'failed': np.fromiter((h.get('status') == 'failed' for h in history), dtype=bool, count=len(history))
+        }
+    
+    def _extract_basic_features(self, transaction: Dict, history: List[Dict] = None, now: float = None,
+                                history_arrays: Dict[str, np.ndarray] = None) -> Dict:
+        """
+        Extract basic features without feature extractor; now (epoch seconds)
+        defaults to the current time, and history_arrays optionally passes in
+        the already computed _history_arrays of history
+        """
+        if now is None:
+            now = time.time()
         
-        # Payment method
+        # Each transaction field is read once; the flags below are computed
+        # from locals rather than looked up again in features
+        amount = transaction.get('amount', 0)
         payment_method = transaction.get('payment_method', '')
-        features['payment_method_credit_card'] = 1 if payment_method == 'credit_card' else 0
-        features['payment_method_digital'] = 1 if payment_method in ['khalti', 'esewa'] else 0
+        device_info = transaction.get('device_info', {})
+        session_duration = transaction.get('session_duration', 0)
+        
+        # Transaction features
+        features = {
+            'transaction_amount': amount,
+            'amount_log': np.log1p(amount),
+            'payment_method_credit_card': 1 if payment_method == 'credit_card' else 0,
+            'payment_method_digital': 1 if payment_method in ('khalti', 'esewa') else 0
+        }
         
-        # Temporal features
-        timestamp = transaction.get('timestamp', datetime.now().timestamp())
+        # Temporal features, from epoch arithmetic in local time
+        timestamp = transaction.get('timestamp', now)
         if isinstance(timestamp, str):
             try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                timestamp = dt.timestamp()
+                timestamp = _parse_iso(timestamp)
             except:
-                dt = datetime.now()
+                pass
         
-        dt = datetime.fromtimestamp(timestamp)
-        features['hour_of_day'] = dt.hour
-        features['day_of_week'] = dt.weekday()
-        features['is_weekend'] = 1 if dt.weekday() >= 5 else 0
-        features['is_night_hours'] = 1 if 0 <= dt.hour < 6 else 0
+        hour, weekday = _local_hour_weekday(timestamp)
+        is_night_hours = 1 if 0 <= hour < 6 else 0
+        features['hour_of_day'] = hour
+        features['day_of_week'] = weekday
+        features['is_weekend'] = 1 if weekday >= 5 else 0
+        features['is_night_hours'] = is_night_hours
         
         # Device features
-        device_info = transaction.get('device_info', {})
         features['device_type_mobile'] = 1 if device_info.get('type') == 'mobile' else 0
         features['browser_chrome'] = 1 if device_info.get('browser') == 'chrome' else 0
         
         # Session features
-        features['session_duration'] = transaction.get('session_duration', 0)
-        features['short_session'] = 1 if features['session_duration'] < 60 else 0
+        short_session = 1 if session_duration < 60 else 0
+        features['session_duration'] = session_duration
+        features['short_session'] = short_session
         
         # User history features
         if history:
+            if history_arrays is None:
+                history_arrays = self._history_arrays(history)
             features['total_transaction_count'] = len(history)
             
             # Calculate average amount
-            amounts = [h.get('amount', 0) for h in history if h.get('amount')]
-            if amounts:
-                features['avg_transaction_amount'] = np.mean(amounts)
-                current_amount = transaction.get('amount', 0)
-                if features['avg_transaction_amount'] > 0:
-                    features['amount_deviation_ratio'] = current_amount / features['avg_transaction_amount']
-                else:
-                    features['amount_deviation_ratio'] = 10
-            else:
-                features['amount_deviation_ratio'] = 10
+            amounts = history_arrays['amounts']
+            amount_deviation_ratio = 10
+            if amounts.size:
+                avg_amount = features['avg_transaction_amount'] = amounts.mean()
+                if avg_amount > 0:
+                    amount_deviation_ratio = amount / avg_amount
+            features['amount_deviation_ratio'] = amount_deviation_ratio
             
             # Count recent transactions
-            now = datetime.now().timestamp()
-            recent_hour = [h for h in history if h.get('timestamp', 0) > now - 3600]
-            recent_day = [h for h in history if h.get('timestamp', 0) > now - 86400]
+            timestamps = history_arrays['timestamps']
+            recent_hour = int(np.count_nonzero(timestamps > now - 3600))
+            recent_day = int(np.count_nonzero(timestamps > now - 86400))
+            hourly_velocity = recent_hour / 1
             
-            features['transactions_last_hour'] = len(recent_hour)
-            features['transactions_last_24h'] = len(recent_day)
-            features['hourly_velocity'] = len(recent_hour) / 1
-            features['daily_velocity'] = len(recent_day) / 24
+            features['transactions_last_hour'] = recent_hour
+            features['transactions_last_24h'] = recent_day
+            features['hourly_velocity'] = hourly_velocity
+            features['daily_velocity'] = recent_day / 24
             
             # Failure rate
-            failures = [h for h in history if h.get('status') == 'failed']
-            features['previous_failure_rate'] = len(failures) / len(history) if history else 0
+            failure_rate = float(history_arrays['failed'].mean())
+            features['previous_failure_rate'] = failure_rate
         else:
+            amount_deviation_ratio = 10
+            hourly_velocity = 0
+            failure_rate = 0
             features['is_first_transaction'] = 1
             features['total_transaction_count'] = 0
             features['amount_deviation_ratio'] = 10
@@ -418,62 +831,37 @@ class FraudPredictor:
             features['previous_failure_rate'] = 0
         
         # Derived features
-        risk_score = 0
-        if features.get('amount_deviation_ratio', 1) > 3:
-            risk_score += 30
-            features['high_amount_deviation'] = 1
-        else:
-            features['high_amount_deviation'] = 0
-        
-        if features.get('hourly_velocity', 0) > 5:
-            risk_score += 25
-            features['high_hourly_velocity'] = 1
-        else:
-            features['high_hourly_velocity'] = 0
-        
-        if features.get('is_night_hours', 0) == 1:
-            risk_score += 15
-            features['night_transaction'] = 1
-        else:
-            features['night_transaction'] = 0
-        
-        if features.get('short_session', 0) == 1:
-            risk_score += 20
-            features['short_session_flag'] = 1
-        else:
-            features['short_session_flag'] = 0
-        
-        if features.get('previous_failure_rate', 0) > 0.3:
-            risk_score += 25
-            features['high_failure_history'] = 1
-        else:
-            features['high_failure_history'] = 0
-        
-        if features.get('is_first_transaction', 0) == 1 and features.get('transaction_amount', 0) > 100:
-            risk_score += 35
-            features['new_user_high_amount'] = 1
-        else:
-            features['new_user_high_amount'] = 0
-        
+        high_amount_deviation = 1 if amount_deviation_ratio > 3 else 0
+        high_hourly_velocity = 1 if hourly_velocity > 5 else 0
+        high_failure_history = 1 if failure_rate > 0.3 else 0
+        new_user_high_amount = 1 if not history and amount > 100 else 0
+        
+        features['high_amount_deviation'] = high_amount_deviation
+        features['high_hourly_velocity'] = high_hourly_velocity
+        features['night_transaction'] = is_night_hours
+        features['short_session_flag'] = short_session
+        features['high_failure_history'] = high_failure_history
+        features['new_user_high_amount'] = new_user_high_amount
+        
+        risk_score = (30 * high_amount_deviation + 25 * high_hourly_velocity + 15 * is_night_hours
+                      + 20 * short_session + 25 * high_failure_history + 35 * new_user_high_amount)
         features['composite_risk_score'] = min(risk_score, 100)
         
         return features
     
     def _ensure_feature_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Ensure all required feature columns are present"""
-        # Define expected columns (simplified)
-        expected_columns = [
-            'transaction_amount', 'amount_log', 'hour_of_day', 'day_of_week',
-            'is_weekend', 'is_night_hours', 'session_duration', 'short_session',
-            'total_transaction_count', 'amount_deviation_ratio', 'hourly_velocity',
-            'previous_failure_rate', 'composite_risk_score'
-        ]
-        
-        for col in expected_columns:
-            if col not in df.columns:
-                df[col] = 0
+        """
+        Ensure all required feature columns are present, as 0 where missing, in
+        one reindex. A model that records its training columns
+        (feature_names_in_) gets exactly those, in training order; otherwise
+        the missing EXPECTED_COLUMNS are appended.
+        """
+        columns = getattr(self.model, 'feature_names_in_', None)
+        if columns is None:
+            present = set(df.columns)
+            columns = [*df.columns, *(col for col in EXPECTED_COLUMNS if col not in present)]
         
-        return df
+        return df.reindex(columns=columns, fill_value=0)
     
     def explain_prediction(self, features: Dict, probability: float = None) -> Dict:
         """
@@ -493,48 +881,13 @@ class FraudPredictor:
             'confidence': probability * 100 if probability else 0
         }
         
-        # Analyze features for explanations
-        if features.get('high_amount_deviation', 0) == 1:
-            deviation = features.get('amount_deviation_ratio', 1)
-            explanation['factors'].append(f"Amount is {deviation:.1f}x higher than user's average")
-            explanation['contributions'].append(30)
-            explanation['risk_factors'].append('HIGH_AMOUNT_DEVIATION')
-        
-        if features.get('high_hourly_velocity', 0) == 1:
-            velocity = features.get('hourly_velocity', 0)
-            explanation['factors'].append(f"High transaction frequency ({velocity:.1f}/hour)")
-            explanation['contributions'].append(25)
-            explanation['risk_factors'].append('HIGH_TRANSACTION_VELOCITY')
-        
-        if features.get('night_transaction', 0) == 1:
-            hour = features.get('hour_of_day', 0)
-            explanation['factors'].append(f"Transaction occurred during unusual hours ({hour}:00)")
-            explanation['contributions'].append(15)
-            explanation['risk_factors'].append('NIGHT_TRANSACTION')
-        
-        if features.get('short_session_flag', 0) == 1:
-            duration = features.get('session_duration', 0)
-            explanation['factors'].append(f"Very short session duration ({duration}s)")
-            explanation['contributions'].append(20)
-            explanation['risk_factors'].append('SHORT_SESSION')
-        
-        if features.get('high_failure_history', 0) == 1:
-            failure_rate = features.get('previous_failure_rate', 0)
-            explanation['factors'].append(f"High previous failure rate ({failure_rate:.0%})")
-            explanation['contributions'].append(25)
-            explanation['risk_factors'].append('HIGH_FAILURE_HISTORY')
-        
-        if features.get('new_user_high_amount', 0) == 1:
-            amount = features.get('transaction_amount', 0)
-            explanation['factors'].append(f"New user with high amount (${amount:.2f})")
-            explanation['contributions'].append(35)
-            explanation['risk_factors'].append('NEW_USER_HIGH_AMOUNT')
-        
-        # Add device anomalies if available
-        if features.get('device_anomaly', 0) == 1:
-            explanation['factors'].append("Unusual device or location pattern")
-            explanation['contributions'].append(20)
-            explanation['risk_factors'].append('DEVICE_ANOMALY')
+        # Analyze features for explanations; a reason is only formatted for
+        # the flags that are set
+        for flag, risk_factor, points, shown, default, reason in EXPLANATION_FACTORS:
+            if features.get(flag, 0) == 1:
+                explanation['factors'].append(reason.format(features.get(shown, default)) if shown else reason)
+                explanation['contributions'].append(points)
+                explanation['risk_factors'].append(risk_factor)
         
         # Calculate total contribution
         total_contribution = sum(explanation['contributions'])
@@ -623,8 +976,7 @@ class FraudPredictor:
                 continue
             
             # Skip sensitive patterns
-            sensitive_patterns = ['password', 'token', 'secret', 'key', 'cvv', 'pin']
-            if any(pattern in key.lower() for pattern in sensitive_patterns):
+            if _is_sensitive(key):
                 sanitized[key] = '[REDACTED]'
             else:
                 # Convert numpy types to Python types
@@ -636,16 +988,17 @@ class FraudPredictor:
         return sanitized
     
     def _features_to_array(self, features: Dict) -> Optional[np.ndarray]:
-        """Convert features dictionary to numpy array"""
+        """
+        Convert features dictionary to a one-row numpy array of its numeric
+        values (the columns select_dtypes(np.number) would keep: no bools,
+        strings or None), read straight from the dict
+        """
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame([features])
-            
-            # Select numeric columns
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            values = [value for value in features.values()
+                      if isinstance(value, (int, float, complex, np.number)) and not isinstance(value, bool)]
             
-            if len(numeric_cols) > 0:
-                return df[numeric_cols].values
+            if values:
+                return np.array([values])
             else:
                 return None
                 
@@ -5,7 +5,7 @@ Trains and evaluates fraud detection models
 
 import pandas as pd
 import numpy as np
-import pickle
+import joblib
 import json
 import os
 import sys
@@ -39,6 +39,9 @@ except ImportError as e:
     print(f"ML libraries not available: {e}")
     ML_AVAILABLE = False
 
+# zlib level for saved models, as FraudPredictor.save_model uses
+MODEL_COMPRESSION = 0
+
 class FraudModelTrainer:
     def __init__(self, config: Dict = None):
         """
@@ -620,8 +623,7 @@ class FraudModelTrainer:
                 'config': self.config
             }
             
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_info, f)
+            joblib.dump(model_info, model_path, compress=MODEL_COMPRESSION)
             
             print(f"✅ Model saved to {model_path}")
             return True
@@ -633,8 +635,7 @@ class FraudModelTrainer:
     def load_model(self, model_path: str) -> Dict:
         """Load trained model from file"""
         try:
-            with open(model_path, 'rb') as f:
-                model_info = pickle.load(f)
+            model_info = joblib.load(model_path, mmap_mode='r')
             
             model = model_info['model']
             feature_names = model_info.get('feature_names', [])
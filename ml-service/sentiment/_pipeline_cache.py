@@ -0,0 +1,35 @@
+"""
+Shared cache of transformer pipeline outputs
+Feedback texts repeat (templated messages, copy-pasted reviews) and one text is
+often classified by several analyzers running the same model, so outputs are
+kept per (model, text) across analyzer instances
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+# Pipeline outputs kept, LRU ordered
+PIPELINE_CACHE_SIZE = 10_000
+
+_cache: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+def cached_pipeline_call(model_name: str, classifier: Callable, text: str) -> Any:
+    """
+    classifier(text), served from the cache when the same model already saw text.
+    Callers must treat the returned output as read-only.
+    """
+    key = (model_name, text)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    
+    output = classifier(text)
+    
+    with _lock:
+        _cache[key] = output
+        if len(_cache) > PIPELINE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return output
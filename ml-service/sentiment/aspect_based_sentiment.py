@@ -6,6 +6,8 @@ from transformers import pipeline
 import re
 from typing import Dict, List, Any, Tuple
 
+from sentiment._pipeline_cache import cached_pipeline_call
+
 class AspectSentimentAnalyzer:
     def __init__(self):
         self.aspects = {
@@ -17,9 +19,10 @@ class AspectSentimentAnalyzer:
             'food': ['food', 'catering', 'meal', 'snack', 'drink']
         }
         
+        self.model_name = "distilbert-base-uncased-finetuned-sst-2-english"
         self.sentiment_analyzer = pipeline(
             "sentiment-analysis",
-            model="distilbert-base-uncased-finetuned-sst-2-english"
+            model=self.model_name
         )
     
     def extract_aspects(self, text: str) -> List[Tuple[str, str]]:
@@ -53,7 +56,7 @@ class AspectSentimentAnalyzer:
         
         if not aspects:
             # General sentiment if no aspects found
-            general_sentiment = self.sentiment_analyzer(text[:512])[0]
+            general_sentiment = cached_pipeline_call(self.model_name, self.sentiment_analyzer, text[:512])[0]
             return {
                 "general_sentiment": {
                     "label": general_sentiment['label'],
@@ -67,7 +70,7 @@ class AspectSentimentAnalyzer:
         
         for aspect, context in aspects:
             # Analyze sentiment for this aspect context
-            sentiment_result = self.sentiment_analyzer(context)[0]
+            sentiment_result = cached_pipeline_call(self.model_name, self.sentiment_analyzer, context)[0]
             
             aspect_results.append({
                 "aspect": aspect,
@@ -6,8 +6,11 @@ from transformers import pipeline
 from typing import Dict, List, Any
 import numpy as np
 
+from sentiment._pipeline_cache import cached_pipeline_call
+
 class EmotionDetector:
     def __init__(self, model_name="j-hartmann/emotion-english-distilroberta-base"):
+        self.model_name = model_name
         self.emotion_classifier = pipeline(
             "text-classification",
             model=model_name,
@@ -18,7 +21,7 @@ class EmotionDetector:
     def detect_emotions(self, text: str) -> Dict:
         """Detect emotions in text"""
         try:
-            results = self.emotion_classifier(text[:512])[0]  # Truncate for model limits
+            results = cached_pipeline_call(self.model_name, self.emotion_classifier, text[:512])[0]  # Truncate for model limits
             
             # Convert to dictionary
             emotions = {}
@@ -13,6 +13,8 @@ import numpy as np
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sentiment._pipeline_cache import cached_pipeline_call
+
 try:
     from sentiment.emotion_detector import EmotionDetector
     from sentiment.aspect_based_sentiment import AspectSentimentAnalyzer
@@ -167,7 +169,8 @@ class SentimentAnalyzer:
             # Base sentiment analysis
             if self.model_loaded and hasattr(self, 'pipeline'):
                 # Use loaded model
-                result = self.pipeline(text[:self.config['performance']['max_length']])[0]
+                result = cached_pipeline_call(self.config['model_name'], self.pipeline,
+                                              text[:self.config['performance']['max_length']])[0]
                 base_sentiment = {
                     'label': result['label'],
                     'score': result['score'],
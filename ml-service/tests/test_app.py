@@ -0,0 +1,23 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_cors')
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the service needs but a feature-extraction pool worker does not
+SERVICE_ONLY_MODULES = ('analytics.generate_reports', 'analytics.chart_generator', 'analytics.insights_engine',
+                        'fraud.predict', 'fraud.train', 'sentiment.sentiment_model', 'matplotlib')
+
+
+def test_pool_workers_skip_service_startup():
+    # A spawned worker runs app.py as __mp_main__ before it can take any work
+    code = ("import json, runpy, sys; runpy.run_path('app.py', run_name='__mp_main__'); "
+            f"print(json.dumps([m for m in {SERVICE_ONLY_MODULES!r} if m in sys.modules]))")
+    done = subprocess.run([sys.executable, '-c', code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True)
+    assert json.loads(done.stdout.splitlines()[-1]) == []
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from analytics.chart_generator import ChartGenerator
+
+
+def _bookings(seed):
+    return [
+        {'date': f'2024-01-{day:02d}', 'bookings': (day * 7 + seed * 13) % 50,
+         'event_type': ('concert', 'conference', 'workshop')[(day + seed) % 3]}
+        for day in range(1, 29)
+    ]
+
+
+def test_reused_figures_render_like_fresh_ones():
+    generator = ChartGenerator()
+    for seed in range(3):
+        data = _bookings(seed)
+        assert generator.generate_booking_trends_chart(data) == ChartGenerator().generate_booking_trends_chart(data)
+
+
+def test_concurrent_renders_match_sequential():
+    datasets = [_bookings(seed) for seed in range(8)]
+    
+    sequential = ChartGenerator()
+    expected = [sequential.render_booking_trends_chart(data) for data in datasets]
+    assert len(set(expected)) == len(datasets)
+    
+    shared = ChartGenerator()
+    for _ in range(3):
+        shared._chart_cache.clear()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(shared.render_booking_trends_chart, datasets))
+        assert results == expected
+
+
+@pytest.mark.parametrize('sources', [{'a': 100, 'b': -20}, {'a': 100, 'b': float('nan')}, {}, {'a': 0}])
+def test_revenue_chart_skips_unplottable_pie(sources):
+    revenue_data = {'sources': sources, 'monthly': {'2024-01': 100, '2024-02': 150}}
+    assert ChartGenerator().generate_revenue_chart(revenue_data).startswith('data:image/png;base64,')
+
+
+def test_revenue_chart_rejects_non_numeric_amounts():
+    generator = ChartGenerator()
+    assert generator.generate_revenue_chart({'sources': {'a': 'x', 'b': 5}}) == ''
+    assert generator.generate_revenue_chart({'monthly': {'2024-01': 'n/a'}}) == ''
+
+
+def test_booking_chart_parses_non_iso_dates():
+    iso = [row for row in _bookings(0) if row['date'] >= '2024-01-13']
+    day_first = [dict(row, date=f"{row['date'][8:]}/01/2024") for row in iso]
+    generator = ChartGenerator()
+    assert generator.render_booking_trends_chart(day_first) == generator.render_booking_trends_chart(iso)
+
+
+def test_booking_chart_skips_missing_counts():
+    data = _bookings(0)
+    data[3]['bookings'] = None
+    assert ChartGenerator().generate_booking_trends_chart(data).startswith('data:image/png;base64,')
+
+
+@pytest.mark.parametrize('bad_row', [{'event_type': 7}, {'bookings': 'many'}, {'date': 'not a date'}],
+                         ids=['mixed-event-types', 'non-numeric-bookings', 'unparseable-date'])
+def test_booking_chart_rejects_unusable_rows(bad_row):
+    data = _bookings(0)
+    data[3].update(bad_row)
+    assert ChartGenerator().generate_booking_trends_chart(data) == ''
+
+
+def _engagement(date_format='2024-01-{day:02d}', **overrides):
+    metrics = [{'date': date_format.format(day=day), 'active_users': 100 + day, 'avg_session_duration': 30.0 * day}
+               for day in range(13, 23)]
+    metrics[2].update(overrides)
+    return {'metrics': metrics, 'feature_usage': {'search': 40, 'booking': 25},
+            'conversion_funnel': {'visit': 100, 'book': 20}}
+
+
+def test_engagement_chart_parses_non_iso_dates():
+    generator = ChartGenerator()
+    day_first = generator.render_user_engagement_chart(_engagement('{day}/01/2024'))
+    assert day_first == generator.render_user_engagement_chart(_engagement())
+
+
+@pytest.mark.parametrize('overrides', [{'active_users': 'n/a'}, {'date': 'not a date'}],
+                         ids=['non-numeric-metric', 'unparseable-date'])
+def test_engagement_chart_rejects_unusable_metrics(overrides):
+    assert ChartGenerator().generate_user_engagement_chart(_engagement(**overrides)) == ''
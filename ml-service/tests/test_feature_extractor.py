@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fraud.feature_extractor import FraudFeatureExtractor
+
+
+def _transactions(n=40, users=6, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {'id': i, 'user_id': f'user_{i % users}', 'amount': float(rng.uniform(5, 900)),
+         'timestamp': 1_700_000_000 + 3600 * i + int(rng.integers(0, 600)),
+         'payment_method': ('credit_card', 'khalti', 'esewa')[i % 3],
+         'status': 'failed' if rng.random() < 0.2 else 'completed',
+         'ip_address': f'10.0.{i % 4}.{i}', 'session_duration': int(rng.integers(10, 600))}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize('wrap', [list, np.array, pd.Series], ids=['list', 'ndarray', 'series'])
+def test_prepare_training_data_accepts_array_labels(wrap):
+    transactions = _transactions()
+    labels = [i % 2 for i in range(30)]
+    
+    df = FraudFeatureExtractor().prepare_training_data(transactions, wrap(labels))
+    
+    expected = pd.Series(labels + [np.nan] * 10, name='is_fraud', dtype=float)
+    pd.testing.assert_series_equal(df['is_fraud'].astype(float), expected)
+
+
+def test_prepare_training_data_without_labels():
+    df = FraudFeatureExtractor().prepare_training_data(_transactions(), [])
+    assert 'is_fraud' not in df.columns
+
+
+@pytest.mark.parametrize('n_chunks', [2, 3, 7])
+def test_prepare_training_data_parallel_matches_serial(process_pool, n_chunks):
+    transactions = _transactions(n=120, users=9, seed=n_chunks)
+    # Rows without an IP or user exercise the conditional columns
+    transactions[0].pop('ip_address')
+    transactions[5].pop('user_id')
+    labels = [i % 3 == 0 for i in range(len(transactions))]
+    extractor = FraudFeatureExtractor()
+    
+    serial = extractor.prepare_training_data(transactions, labels)
+    parallel = extractor.prepare_training_data(transactions, labels, executor=process_pool, n_chunks=n_chunks)
+    
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_extract_features_batch_parallel_matches_serial(process_pool):
+    transactions = _transactions(n=50, users=5, seed=3)
+    histories = {f'user_{u}': _transactions(n=12, users=1, seed=u) for u in range(5)}
+    extractor = FraudFeatureExtractor()
+    
+    # Every transaction has a timestamp, so velocity windows do not depend on
+    # when (or in which process) extraction runs
+    serial = extractor.extract_features_batch(transactions, histories)
+    parallel = extractor.extract_features_batch(transactions, histories, executor=process_pool, chunk_size=8)
+    
+    assert pd.DataFrame(parallel).equals(pd.DataFrame(serial))
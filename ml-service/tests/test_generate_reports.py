@@ -0,0 +1,68 @@
+from datetime import datetime as real_datetime
+
+import numpy as np
+import pytest
+
+from analytics import generate_reports
+from analytics.generate_reports import ReportGenerator
+
+
+def _events():
+    return [
+        {'event_id': i, 'event_name': f'Event {i}', 'date': f'2024-03-{i + 1:02d}',
+         'category': ('music', 'tech')[i % 2], 'attendees': 50 + 10 * i, 'capacity': 200,
+         'revenue': 1000.0 + 250 * i, 'cost': 800.0 + 100 * i, 'ticket_price': 20.0 + i,
+         'rating': 3.5 + (i % 3) / 2}
+        for i in range(12)
+    ]
+
+
+def test_cached_report_gets_fresh_metadata(monkeypatch):
+    generator = ReportGenerator()
+    first = generator.generate_event_analytics_report(_events(), include_charts=False)
+    assert first['success']
+    
+    class LaterDatetime(real_datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return real_datetime(2030, 1, 1, 12, 0, 0)
+    
+    monkeypatch.setattr(generate_reports, 'datetime', LaterDatetime)
+    second = generator.generate_event_analytics_report(_events(), include_charts=False)
+    
+    assert second['metadata'] is second['report']['metadata']
+    assert second['metadata']['generated_at'] == '2030-01-01T12:00:00'
+    assert second['metadata']['report_id'] != first['metadata']['report_id']
+    assert first['metadata']['generated_at'] != '2030-01-01T12:00:00'
+    
+    first['report'].pop('metadata')
+    second['report'].pop('metadata')
+    assert second['report'] == first['report']
+
+
+class _RecordingCharts:
+    """Chart generator stand-in that keeps the arrays it is given"""
+    
+    def generate_booking_trends_chart_soa(self, dates, bookings, event_types):
+        self.columns = (dates, bookings, event_types)
+        return ''
+
+
+@pytest.mark.parametrize('polars', [True, False], ids=['polars', 'pandas'])
+def test_booking_trends_drop_rows_without_attendees(monkeypatch, polars):
+    if polars and not generate_reports.POLARS_AVAILABLE:
+        pytest.skip("polars not installed")
+    monkeypatch.setattr(generate_reports, 'POLARS_AVAILABLE', polars)
+    events = _events()
+    events[3]['attendees'] = float('nan')
+    events[7]['attendees'] = None
+    generator = ReportGenerator()
+    generator.chart_generator = _RecordingCharts()
+    
+    generator._booking_trends_job(generator._prepare_dataframe(generator._to_frame(events)), 'category')
+    
+    dates, bookings, event_types = generator.chart_generator.columns
+    kept = [event for i, event in enumerate(events) if i not in (3, 7)]
+    np.testing.assert_array_equal(bookings, [event['attendees'] for event in kept])
+    np.testing.assert_array_equal(dates, np.array([event['date'] for event in kept], dtype='datetime64[s]'))
+    assert list(event_types) == [event['category'] for event in kept]
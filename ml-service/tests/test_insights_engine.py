@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import insights_engine
+from analytics.insights_engine import InsightsEngine
+
+pytestmark = pytest.mark.skipif(not insights_engine.POLARS_AVAILABLE, reason="polars not installed")
+
+
+def _events(n, ticket_price):
+    return [
+        {'event_name': f'Event {i}', 'event_type': ('music', 'tech')[i % 2],
+         'attendees': 40 + 7 * i, 'capacity': 120, 'revenue': 900.0 + 130 * i, 'cost': 700.0 + 90 * i,
+         'ticket_price': ticket_price(i), 'rating': 2.5 + (i % 4) / 2}
+        for i in range(n)
+    ]
+
+
+def _analyze(events, polars):
+    original = insights_engine.POLARS_AVAILABLE
+    insights_engine.POLARS_AVAILABLE = polars
+    try:
+        return InsightsEngine().analyze_event_performance(events)
+    finally:
+        insights_engine.POLARS_AVAILABLE = original
+
+
+@pytest.mark.parametrize('n', [6, 15])
+@pytest.mark.parametrize('ticket_price', [lambda i: 20.0 + i, lambda i: None, lambda i: np.nan],
+                         ids=['prices', 'null', 'nan'])
+def test_recommendations_match_pandas(n, ticket_price):
+    events = _events(n, ticket_price)
+    polars_insights = _analyze(events, polars=True)
+    pandas_insights = _analyze(events, polars=False)
+    assert polars_insights['recommendations'] == pandas_insights['recommendations']
+    assert polars_insights['risk_alerts'] == pandas_insights['risk_alerts']
+
+
+@pytest.mark.parametrize('missing', [{'cost': None}, {'revenue': 0.0, 'cost': 0.0}], ids=['null', 'nan'])
+def test_top_events_keep_events_without_roi_last(missing):
+    events = _events(8, lambda i: 20.0 + i)
+    for i in (0, 2, 3, 5, 6, 7):
+        events[i].update(missing)
+    polars_top = _analyze(events, polars=True)['top_performing_events']
+    pandas_top = _analyze(events, polars=False)['top_performing_events']
+    assert len(polars_top) == 5
+    pd.testing.assert_frame_equal(pd.DataFrame(polars_top), pd.DataFrame(pandas_top), check_dtype=False)
+
+
+@pytest.mark.parametrize('dates', [['2024-01-15', '2024-02-16T10:30:00'], ['15/01/2024', '16/02/2024'],
+                                   ['15 Jan 2024', '16 Feb 2024']], ids=['iso', 'day-first', 'month-name'])
+def test_polars_dates_parse_like_pandas(dates):
+    import polars as pl
+    parsed = insights_engine._parse_dates_polars(pl.Series('date', dates))
+    expected = insights_engine._parse_dates(pd.Series(dates, name='date'))
+    assert parsed.name == 'date'
+    assert parsed.to_list() == expected.dt.to_pydatetime().tolist()
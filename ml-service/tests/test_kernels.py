@@ -0,0 +1,104 @@
+"""Each numba kernel against the NumPy fallback used when numba is missing"""
+import numpy as np
+import pytest
+
+from analytics import _kernels as analytics_kernels
+from analytics import chart_generator
+from fraud import _kernels as fraud_kernels
+
+pytestmark = pytest.mark.skipif(not chart_generator.NUMBA_AVAILABLE, reason="numba not installed")
+
+
+def both_paths(module, function, *args):
+    """function(*args) with the compiled kernel, then with the NumPy fallback"""
+    compiled = function(*args)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(module, 'NUMBA_AVAILABLE', False)
+        fallback = function(*args)
+    return compiled, fallback
+
+
+def assert_same(compiled, fallback):
+    if isinstance(compiled, tuple):
+        assert len(compiled) == len(fallback)
+        for a, b in zip(compiled, fallback):
+            assert_same(a, b)
+    else:
+        np.testing.assert_allclose(np.asarray(compiled, dtype=float), np.asarray(fallback, dtype=float),
+                                   rtol=1e-9, equal_nan=True)
+
+
+def with_nans(rng, values, share=0.1):
+    values = values.astype(float)
+    values[rng.random(values.shape) < share] = np.nan
+    return values
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('n', [0, 1, 2, 50])
+def test_history_statistics(seed, n):
+    rng = np.random.default_rng(seed)
+    amount = with_nans(rng, rng.uniform(0, 500, n))
+    timestamps = with_nans(rng, np.sort(rng.uniform(1.6e9, 1.7e9, n)))
+    failed = rng.random(n) < 0.3
+    assert_same(*both_paths(fraud_kernels, fraud_kernels.history_statistics, amount, timestamps, failed))
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+@pytest.mark.parametrize('seed', range(5))
+def test_prior_window_counts(seed, ordered):
+    rng = np.random.default_rng(seed)
+    n = 300
+    users = rng.integers(0, 12, n)
+    timestamps = rng.uniform(0, 50_000, n)
+    if ordered:
+        timestamps.sort()
+    timestamps = with_nans(rng, timestamps, 0.05)
+    thresholds = np.nan_to_num(timestamps, nan=25_000) - 3600
+    assert_same(*both_paths(fraud_kernels, fraud_kernels.prior_window_counts, users, timestamps, thresholds))
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_deviating_features(dtype):
+    rng = np.random.default_rng(0)
+    features = rng.normal(0, 1.5, (200, 9)).astype(dtype)
+    scores = rng.uniform(-0.5, 0.5, 200)
+    assert_same(*both_paths(fraud_kernels, fraud_kernels.deviating_features, features, scores, 0.0, 2.0))
+
+
+def test_rule_masks():
+    rng = np.random.default_rng(0)
+    n = 500
+    values = np.column_stack([
+        rng.choice([0, 3, 3.5, 5, 6], n), rng.choice([0, 5, 6, 10, 11], n),
+        rng.integers(0, 2, n), rng.integers(0, 2, n), rng.integers(0, 2, n),
+        rng.choice([50, 100, 101], n), rng.choice([0, 0.5, 0.6], n)
+    ])
+    compiled, fallback = both_paths(fraud_kernels, fraud_kernels.rule_masks, values)
+    np.testing.assert_array_equal(compiled, fallback)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_summary_reductions(seed):
+    rng = np.random.default_rng(seed)
+    revenue = with_nans(rng, rng.uniform(0, 1e4, 400))
+    attendees = with_nans(rng, rng.integers(0, 500, 300))
+    rating = with_nans(rng, rng.choice([1.0, 2.5, 3.0, 4.0, 4.5, 5.0], 350))
+    bins = np.array([0, 2, 3, 4, 4.5, 5.0])
+    assert_same(*both_paths(analytics_kernels, analytics_kernels.summary_reductions,
+                            revenue, attendees, rating, bins))
+
+
+def test_summary_reductions_missing_columns():
+    assert_same(*both_paths(analytics_kernels, analytics_kernels.summary_reductions,
+                            None, np.array([1.0, 2.0]), None, np.array([0.0, 5.0])))
+
+
+@pytest.mark.parametrize('values', [np.array([]), np.array([3.0, 3.0]),
+                                    np.array([0.0, 1.0, np.nan, np.inf, 9.0, 10.0]),
+                                    np.random.default_rng(0).exponential(300, 5000)],
+                         ids=['empty', 'constant', 'non-finite', 'sessions'])
+def test_session_histogram(values):
+    compiled, fallback = both_paths(chart_generator, chart_generator._histogram, values, 30)
+    np.testing.assert_array_equal(compiled[0], fallback[0])
+    np.testing.assert_array_equal(compiled[1], fallback[1])
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from fraud.predict import EXPECTED_COLUMNS, FraudPredictor
+
+
+def _features(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        features = {column: float(rng.uniform(0, 10)) for column in EXPECTED_COLUMNS}
+        features['is_night_hours'] = int(rng.integers(0, 2))
+        features['short_session'] = int(rng.integers(0, 2))
+        if i % 7 == 0:
+            del features['hourly_velocity']
+        rows.append(features)
+    return rows
+
+
+def _trained_predictor():
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.uniform(0, 10, (200, len(EXPECTED_COLUMNS))), columns=list(EXPECTED_COLUMNS))
+    y = (X['transaction_amount'] + X['hourly_velocity'] > 10).astype(int)
+    
+    predictor = FraudPredictor()
+    predictor.model = LogisticRegression(max_iter=1000).fit(X, y)
+    predictor.model_loaded = True
+    return predictor
+
+
+class _PassThroughExtractor:
+    """Feature extractor stand-in that uses the transaction as its features"""
+    
+    def extract_features(self, transaction, history=None):
+        return dict(transaction)
+
+
+@pytest.mark.parametrize('trained', [False, True], ids=['rules', 'model'])
+def test_predict_many_matches_per_row_predict(trained):
+    predictor = _trained_predictor() if trained else FraudPredictor()
+    features_list = _features()
+    
+    batch = predictor.predict_many(features_list)
+    predictor.clear_prediction_cache()
+    single = [predictor.predict(features) for features in features_list]
+    
+    # Batched and single-row BLAS calls may differ in the last bit, which the
+    # confidence (probability * 100) carries
+    def without_confidence(predictions):
+        return [(flag, {k: v for k, v in explanation.items() if k != 'confidence'})
+                for flag, _, explanation in predictions]
+    
+    assert without_confidence(batch) == without_confidence(single)
+    np.testing.assert_allclose([p for _, p, _ in batch], [p for _, p, _ in single], rtol=1e-12)
+
+
+def test_predict_many_with_frame_matches_dicts():
+    predictor = _trained_predictor()
+    features_list = _features()
+    
+    from_dicts = predictor.predict_many(features_list)
+    predictor.clear_prediction_cache()
+    from_frame = predictor.predict_many(features_list, pd.DataFrame(features_list))
+    
+    np.testing.assert_allclose([p for _, p, _ in from_frame], [p for _, p, _ in from_dicts], rtol=1e-12)
+
+
+def test_predict_batch_degrades_only_failing_rows():
+    predictor = _trained_predictor()
+    predictor.feature_extractor = _PassThroughExtractor()
+    transactions = [dict(features, id=f'txn_{i}') for i, features in enumerate(_features(10))]
+    transactions[3]['amount_log'] = 'not a number'        # the model cannot score it
+    transactions[6]['hourly_velocity'] = 'not a number'   # nor can the rules
+    
+    results = predictor.predict_batch(transactions)
+    
+    assert results[6]['success'] is False and 'error' in results[6]
+    assert results[3]['explanation']['method'] == 'rule_based'
+    for i, result in enumerate(results):
+        if i not in (3, 6):
+            assert 'method' not in result['explanation']
+            expected = predictor.predict({k: v for k, v in transactions[i].items() if k != 'id'})
+            assert result['prediction']['probability'] == pytest.approx(expected[1])
+
+
+def test_saved_model_loads_memory_mapped(tmp_path):
+    predictor = _trained_predictor()
+    path = str(tmp_path / 'fraud_model.pkl')
+    assert predictor.save_model(path)
+    
+    loaded = FraudPredictor(path)
+    assert loaded.model_loaded
+    assert isinstance(loaded.model.coef_, np.memmap)
+    np.testing.assert_array_equal(loaded.model.coef_, predictor.model.coef_)
+
+
+def test_assigning_a_model_drops_cached_probabilities():
+    predictor = _trained_predictor()
+    features = _features(1)[0]
+    first = predictor.predict(features)[1]
+    
+    class Constant:
+        def predict_proba(self, X):
+            return np.tile([0.25, 0.75], (len(X), 1))
+    
+    predictor.model = Constant()
+    assert first != 0.75
+    assert predictor.predict(features)[1] == 0.75
+
+
+def test_predict_batch_parallel_extraction_matches_serial(process_pool):
+    predictor = FraudPredictor()
+    transactions = [
+        {'id': i, 'user_id': f'user_{i % 4}', 'amount': 20.0 + 37 * i, 'timestamp': 1_700_000_000 + 900 * i,
+         'payment_method': 'credit_card', 'ip_address': f'10.1.0.{i}', 'session_duration': 15 * i}
+        for i in range(40)
+    ]
+    history = {f'user_{u}': [{'amount': 50.0 + u, 'timestamp': 1_699_990_000 + 600 * k,
+                              'status': 'failed' if k % 5 == 0 else 'completed'} for k in range(8)]
+               for u in range(4)}
+    
+    serial = predictor.predict_batch(transactions, history)
+    parallel = predictor.predict_batch(transactions, history, executor=process_pool, chunk_size=6)
+    
+    assert parallel == serial